@@ -0,0 +1,105 @@
+"""
+Compares the compression ratio and throughput of the codecs of Compressed, on
+payloads representative of job outputs:
+
+- checkpoint: float32 weights, plus optimiser state which is mostly zeros;
+- json: an annotations-like JSON document;
+- random: incompressible bytes.
+
+    python benchmarks/bench_compressed_codecs.py [--size MB]
+
+Codecs whose library isn't installed are skipped.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+
+from ufdl.jobtypes.standard.util import BLOB, Compressed
+from ufdl.jobtypes.standard.util._codecs import is_codec_available
+
+# The codecs and compression levels compared (None for the codec's default)
+CODEC_LEVELS = (
+    ("stored", None),
+    ("deflate", 1),
+    ("deflate", None),
+    ("bzip2", None),
+    ("lzma", None),
+    ("zstd", 1),
+    ("zstd", None),
+    ("zstd", 9),
+    ("zstd", 19),
+    ("lz4", None),
+    ("lz4", 9)
+)
+
+# Codecs too slow to be worth running on incompressible data
+SLOW_CODEC_LEVELS = ("bzip2", None), ("lzma", None), ("zstd", 19)
+
+
+def make_payloads(size: int) -> dict:
+    random.seed(0)
+
+    floats = size // 4
+    weights = array("f", (random.gauss(0, 0.02) for _ in range(floats * 3 // 4)))
+    state = array("f", (0.0 if random.random() < 0.7 else random.gauss(0, 1) for _ in range(floats // 4)))
+
+    annotations = []
+    while len(annotations) * 80 < size:
+        index = len(annotations)
+        annotations.append({
+            "pk": index,
+            "name": f"image_{index:06d}.jpg",
+            "label": ("cat", "dog")[index % 2],
+            "score": round(random.random(), 4)
+        })
+
+    return {
+        "checkpoint": weights.tobytes() + state.tobytes(),
+        "json": json.dumps(annotations).encode("UTF-8"),
+        "random": os.urandom(size)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=16, help="approximate size of each payload in MB")
+    args = parser.parse_args()
+
+    for payload_name, payload in make_payloads(args.size << 20).items():
+        print(f"{payload_name}: {len(payload) / 1e6:.1f} MB")
+
+        for codec, level in CODEC_LEVELS:
+            description = codec if level is None else f"{codec} {level}"
+
+            if not is_codec_available(codec):
+                print(f"  {description:10s} not installed")
+                continue
+
+            if payload_name == "random" and (codec, level) in SLOW_CODEC_LEVELS:
+                continue
+
+            compressed_type = Compressed(BLOB("payload"), codec, level)
+
+            start = time.perf_counter()
+            compressed = compressed_type.format_python_value(payload)
+            compress_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decompressed = compressed_type.parse_binary_value(compressed)
+            decompress_time = time.perf_counter() - start
+
+            assert decompressed == payload
+
+            print(
+                f"  {description:10s} "
+                f"ratio {len(payload) / len(compressed):6.2f}   "
+                f"compress {len(payload) / 1e6 / compress_time:8.1f} MB/s   "
+                f"decompress {len(payload) / 1e6 / decompress_time:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares parsing container values with and without validating the whole
+container against its schema first (as Array and Map used to), against an
+in-memory stand-in for the server.
+
+    python benchmarks/bench_container_parse.py [--repeat N]
+
+For PK elements, the number of times the server's table is listed is also
+shown, as the container's schema embeds the element type's schema, which
+lists the whole table.
+"""
+import argparse
+import timeit
+
+from ufdl.jobtypes.base import Integer, String, UFDLJSONType
+from ufdl.jobtypes.initialise import initialise_server
+from ufdl.jobtypes.standard import PK
+from ufdl.jobtypes.standard.container import Array, Map
+from ufdl.jobtypes.standard.server import Dataset, Domain
+from ufdl.jobtypes.util import parse_type
+
+DOMAIN = "Image Classification"
+
+# The stand-in server's tables. Every row matches the filters the benchmarked
+# types list with, so filters are ignored
+TABLES = {
+    "domains": [{"pk": 1, "name": "ic", "description": DOMAIN}],
+    "datasets": [
+        {"pk": pk, "name": f"dataset{pk}", "version": 1, "domain": DOMAIN}
+        for pk in range(1, 5001)
+    ]
+}
+
+LIST_CALLS = []
+
+
+def list_function(table_name, filter):
+    LIST_CALLS.append(table_name)
+    return TABLES[table_name]
+
+
+def download_function(table_name, pk):
+    raise NotImplementedError("Nothing is downloaded by this benchmark")
+
+
+def parse_validating_first(ufdl_type: UFDLJSONType, value):
+    UFDLJSONType.validate_with_schema(ufdl_type, value)
+    return ufdl_type.parse_json_value(value)
+
+
+def parse(ufdl_type: UFDLJSONType, value):
+    return ufdl_type.parse_json_value(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of each parse")
+    args = parser.parse_args()
+
+    initialise_server(
+        list_function,
+        download_function,
+        dict(Array=Array, Map=Map, PK=PK, Dataset=Dataset, Domain=Domain, Integer=Integer, String=String)
+    )
+
+    cases = [
+        ("Array<Integer>, 10^4 elements", parse_type("Array<Integer>"), list(range(10_000))),
+        ("Map<String>, 10^4 entries", parse_type("Map<String>"), {f"key{i}": "value" for i in range(10_000)}),
+        (
+            "Array<PK<Dataset>>, 500 of 5000 rows",
+            parse_type(f"Array<PK<Dataset<Domain<'{DOMAIN}'>>>>"),
+            list(range(1, 501))
+        )
+    ]
+
+    for description, ufdl_type, value in cases:
+        print(description)
+
+        for method, parse_function in (("schema first", parse_validating_first), ("elements only", parse)):
+            LIST_CALLS.clear()
+            parse_function(ufdl_type, value)
+            list_calls = len(LIST_CALLS)
+
+            time = timeit.timeit(lambda: parse_function(ufdl_type, value), number=args.repeat) / args.repeat
+
+            print(f"  {method:13s} {time * 1000:7.1f} ms   {list_calls} list calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares the JSON libraries which can decode/encode the binary form of JSON
+values (see initialise_json_backend), on a large JSON document of float
+arrays such as a job might output.
+
+    python benchmarks/bench_json_backend.py [--repeat N]
+
+Libraries which aren't installed are skipped.
+"""
+import argparse
+import random
+import timeit
+
+from ufdl.jobtypes.initialise import initialise_json_backend, json_dumps, json_loads, JSON_BACKENDS
+
+
+def make_document(keys: int = 2000, length: int = 50) -> dict:
+    random.seed(0)
+    return {f"key{i}": [random.random() for _ in range(length)] for i in range(keys)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="number of timed runs of each operation")
+    args = parser.parse_args()
+
+    document = make_document()
+    initialise_json_backend("json")
+    binary = json_dumps(document)
+
+    print(f"JSON document of {len(document)} float arrays, {len(binary) / 1e6:.1f} MB encoded")
+
+    for name in reversed(JSON_BACKENDS):
+        try:
+            initialise_json_backend(name, encode=True)
+        except ImportError:
+            print(f"  {name:7s} not installed")
+            continue
+
+        # All libraries decode to the same values
+        assert json_loads(binary) == document
+        assert json_loads(json_dumps(document)) == document
+
+        encode = timeit.timeit(lambda: json_dumps(document), number=args.repeat) / args.repeat
+        decode = timeit.timeit(lambda: json_loads(binary), number=args.repeat) / args.repeat
+
+        print(f"  {name:7s} encode {encode * 1000:7.1f} ms   decode {decode * 1000:7.1f} ms")
+
+    initialise_json_backend("json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares validating values of the value-types natively with validating them
+with jsonschema, against the type's schema (as ValueType used to). Both valid
+and invalid values are timed, and the two are checked to fail the same way.
+
+    python benchmarks/bench_value_validation.py [--number N]
+"""
+import argparse
+import timeit
+
+from jsonschema import ValidationError
+
+from ufdl.jobtypes.base import Boolean, Float, Integer, String, UFDLJSONType, ValueType
+
+
+def validate_with_jsonschema(value_type: ValueType, value):
+    UFDLJSONType.validate_with_schema(value_type, value)
+
+
+def validate_natively(value_type: ValueType, value):
+    value_type.validate_with_schema(value)
+
+
+def error(validate, value_type: ValueType, value):
+    try:
+        validate(value_type, value)
+    except ValidationError as e:
+        return e.message, e.validator
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100_000, help="number of timed validations of each value")
+    args = parser.parse_args()
+
+    cases = [
+        ("String", String(), "value"),
+        ("Integer", Integer(), 5),
+        ("Integer", Integer(), True),
+        ("Float", Float(), 2.5),
+        ("Boolean", Boolean(), True),
+        ("Boolean", Boolean(), 1),
+        ("'value'", ValueType.generate_subclass("value")(), "value"),
+        ("1", ValueType.generate_subclass(1)(), True),
+    ]
+
+    for description, value_type, value in cases:
+        # Both fail (or not) with the same error
+        assert error(validate_natively, value_type, value) == error(validate_with_jsonschema, value_type, value)
+
+        print(f"{description} validating {value!r}")
+
+        for method, validate in (("jsonschema", validate_with_jsonschema), ("native", validate_natively)):
+            def validate_once():
+                try:
+                    validate(value_type, value)
+                except ValidationError:
+                    pass
+
+            time = timeit.timeit(validate_once, number=args.number) / args.number
+
+            print(f"  {method:10s} {time * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
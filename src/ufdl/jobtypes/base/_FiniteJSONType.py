@@ -1,15 +1,192 @@
-from typing import List
+from threading import RLock
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, Hashable, Optional, Sequence, Tuple
+from weakref import WeakKeyDictionary
 
+from jsonschema import ValidationError
 from wai.json.raw import RawJSONElement
 
 from ._UFDLJSONType import UFDLJSONType, TypeArgsType, InputType, OutputType
 
+if TYPE_CHECKING:
+    from ._TableSnapshot import ChangePosition, TableSnapshot
+
+
+def membership_key(value: RawJSONElement) -> Hashable:
+    """
+    Gets the key under which a value is held in a membership index. Booleans
+    are tagged, as they compare equal to 0 and 1 but are distinct JSON values.
+
+    :param value:
+                The value.
+    :return:
+                The key.
+    """
+    return (bool, value) if isinstance(value, bool) else value
+
+
+def value_from_membership_key(key: Hashable) -> RawJSONElement:
+    """
+    Gets the value held under a key in a membership index.
+
+    :param key:
+                The key.
+    :return:
+                The value.
+    """
+    return key[1] if isinstance(key, tuple) else key
+
 
 class FiniteJSONType(
     UFDLJSONType[TypeArgsType, InputType, OutputType]
 ):
-    def list_all_json_values(self) -> List[RawJSONElement]:
+    # Hash-set index of the values of each type, with the server listing it was built from,
+    # so that the index is only rebuilt when a new listing (snapshot) is obtained
+    _membership_indices: 'WeakKeyDictionary[FiniteJSONType, Tuple[Sequence[Any], AbstractSet[Hashable]]]' = WeakKeyDictionary()
+
+    # Index of the values of each type whose listing is taken from a table snapshot, as the
+    # number of rows with each value, with the snapshot and the position in its log of changes
+    # the index is up-to-date with, so that only the changes since then need to be applied
+    _snapshot_indices: 'WeakKeyDictionary[FiniteJSONType, Tuple[TableSnapshot, ChangePosition, Dict[Hashable, int]]]' = WeakKeyDictionary()
+
+    # Re-entrant, as deriving a value from a listed row can require the index of another type
+    _membership_lock = RLock()
+
+    def list_all_json_values(self) -> Sequence[RawJSONElement]:
         """
         Gets a list of all applicable values from the server.
         """
         raise NotImplementedError(self.list_all_json_values.__name__)
+
+    def server_listing(self) -> Sequence[Any]:
+        """
+        Gets the listing that the values of this type are derived from. Listings
+        which are served from a cache are the same object for as long as they
+        remain cached, so indices built from them can be reused.
+        """
+        return self.list_all_json_values()
+
+    def json_value_from_listing(self, listed: Any) -> RawJSONElement:
+        """
+        Gets the value of this type represented by an item of the server listing.
+
+        :param listed:
+                    The listed item.
+        :return:
+                    The value.
+        """
+        return listed
+
+    def listing_snapshot(self) -> Optional[Tuple['TableSnapshot', Optional[float]]]:
+        """
+        Gets the table snapshot that the server listing is taken from, if any.
+
+        :return:
+                    The snapshot and the maximum number of seconds since its
+                    last refresh, or None if the listing isn't taken from a
+                    snapshot.
+        """
+        return None
+
+    def index_listing(self, listing: Sequence[Any]) -> AbstractSet[Hashable]:
+        """
+        Gets the membership index of the values in a server listing, building
+        it only if it wasn't built from the same listing last time.
+
+        :param listing:
+                    The server listing.
+        :return:
+                    The set of membership keys of the values.
+        """
+        with FiniteJSONType._membership_lock:
+            cached = FiniteJSONType._membership_indices.get(self, None)
+            if cached is not None and cached[0] is listing:
+                return cached[1]
+
+            index = frozenset(
+                membership_key(self.json_value_from_listing(listed))
+                for listed in listing
+            )
+
+            FiniteJSONType._membership_indices[self] = listing, index
+
+            return index
+
+    def index_snapshot(self, snapshot: 'TableSnapshot') -> AbstractSet[Hashable]:
+        """
+        Gets the membership index of the values in a table snapshot, applying
+        only the changes to the snapshot since the index was last updated.
+
+        :param snapshot:
+                    The snapshot.
+        :return:
+                    The set of membership keys of the values.
+        """
+        with FiniteJSONType._membership_lock:
+            cached = FiniteJSONType._snapshot_indices.get(self, None)
+
+            if cached is not None and cached[0] is snapshot:
+                position, changes, rebuilt = snapshot.changes_since(cached[1])
+            else:
+                position, changes, rebuilt = snapshot.changes_since()
+
+            counts = {} if rebuilt else cached[2]
+
+            for old, new in changes:
+                if old is not None:
+                    key = membership_key(self.json_value_from_listing(old))
+                    counts[key] -= 1
+                    if counts[key] == 0:
+                        del counts[key]
+
+                if new is not None:
+                    key = membership_key(self.json_value_from_listing(new))
+                    counts[key] = counts.get(key, 0) + 1
+
+            FiniteJSONType._snapshot_indices[self] = snapshot, position, counts
+
+            return counts.keys()
+
+    def membership_index(self) -> AbstractSet[Hashable]:
+        """
+        Gets the membership index of all values of this type.
+        """
+        source = self.listing_snapshot()
+
+        if source is None:
+            return self.index_listing(self.server_listing())
+
+        snapshot, max_age = source
+        snapshot.ensure_fresh(max_age)
+        return self.index_snapshot(snapshot)
+
+    def validate_membership(self, value: RawJSONElement, index: Optional[AbstractSet[Hashable]] = None):
+        """
+        Validates that a value is one of the values of this type, in constant time.
+        Equivalent to validating against an enum schema of all values.
+
+        :param value:
+                    The value to validate.
+        :param index:
+                    The membership index to check against, or None to use
+                    the index of the current server listing.
+        """
+        if index is None:
+            index = self.membership_index()
+
+        try:
+            is_member = membership_key(value) in index
+        except TypeError:
+            # Unhashable values (arrays/objects) can't be members
+            is_member = False
+
+        if not is_member:
+            # Built from the index, rather than listing the values again
+            with FiniteJSONType._membership_lock:
+                values = [value_from_membership_key(key) for key in index]
+            raise ValidationError(
+                f"{value!r} is not one of {values!r}",
+                validator="enum",
+                validator_value=values,
+                instance=value,
+                schema={"enum": values}
+            )
@@ -1,4 +1,7 @@
-from typing import Optional
+import asyncio
+import operator
+from functools import reduce
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from ufdl.json.core.filter import FilterExpression
 from wai.json.raw import RawJSONObject
@@ -13,6 +16,9 @@ class NamedServerType(
     """
     Server types from which we can extract a unique name.
     """
+    # The maximum number of names to request from the server at once
+    BATCH_SIZE: int = 100
+
     def extract_name_from_json(self, value: RawJSONObject) -> str:
         """
         Gets the name of the value from its JSON representation.
@@ -35,6 +41,19 @@ class NamedServerType(
         """
         raise NotImplementedError(self.name_filter.__name__)
 
+    def normalise_name(self, name: str) -> Hashable:
+        """
+        Gets the form of a name which name_filter matches on, so that names which
+        the filter treats as the same (e.g. differently-formatted versions) are
+        also matched to the same value when names are looked up in batches.
+
+        :param name:
+                    The name.
+        :return:
+                    The normalised name.
+        """
+        return name
+
     def get_json_value_by_name(self, name: str) -> Optional[RawJSONObject]:
         """
         Gets the JSON representation of the value with the specified name.
@@ -60,3 +79,141 @@ class NamedServerType(
         if json_value is None:
             raise Exception(f"Failed to get JSON value by name \"{name}\"")
         return self.parse_json_value(json_value)
+
+    def names_filters(self, names: Sequence[str]) -> Iterator[FilterExpression]:
+        """
+        Gets filters which together select the values with the given names,
+        one for each batch of names.
+
+        :param names:
+                    The (unique) names to filter for.
+        :return:
+                    An iterator over the filters.
+        """
+        for batch_start in range(0, len(names), NamedServerType.BATCH_SIZE):
+            yield reduce(
+                operator.or_,
+                (self.name_filter(name) for name in names[batch_start:batch_start + NamedServerType.BATCH_SIZE])
+            )
+
+    def get_json_values_by_names(self, names: Iterable[str]) -> Dict[str, RawJSONObject]:
+        """
+        Gets the JSON representations of the values with the specified names,
+        using a single request to the server for each batch of names.
+
+        :param names:
+                    The names to look for.
+        :return:
+                    A map from each name that was found to the JSON object
+                    representing its value on the server.
+        """
+        names = list(dict.fromkeys(names))
+        return self.match_json_values_to_names(
+            names,
+            (
+                json_value
+                for names_filter in self.names_filters(names)
+                for json_value in self.get_filtered_list_of_json_values(names_filter)
+            )
+        )
+
+    async def get_json_values_by_names_async(self, names: Iterable[str]) -> Dict[str, RawJSONObject]:
+        """
+        Gets the JSON representations of the values with the specified names,
+        requesting all batches of names from the server concurrently.
+
+        :param names:
+                    The names to look for.
+        :return:
+                    A map from each name that was found to the JSON object
+                    representing its value on the server.
+        """
+        names = list(dict.fromkeys(names))
+        results = await asyncio.gather(
+            *(
+                self.get_filtered_list_of_json_values_async(names_filter)
+                for names_filter in self.names_filters(names)
+            )
+        )
+        return self.match_json_values_to_names(
+            names,
+            (
+                json_value
+                for result in results
+                for json_value in result
+            )
+        )
+
+    def match_json_values_to_names(
+            self,
+            names: Iterable[str],
+            json_values: Iterable[RawJSONObject]
+    ) -> Dict[str, RawJSONObject]:
+        """
+        Matches the JSON values listed from the server to the requested names.
+
+        :param names:
+                    The requested names.
+        :param json_values:
+                    The values listed from the server.
+        :return:
+                    A map from each name that was found to the first JSON
+                    value with that name.
+        """
+        # Names are matched as name_filter matches them, so several names may match the same value
+        requested_names: Dict[Hashable, List[str]] = {}
+        for name in names:
+            requested_names.setdefault(self.normalise_name(name), []).append(name)
+
+        matched_json_values = {}
+        for json_value in json_values:
+            for name in requested_names.pop(self.normalise_name(self.extract_name_from_json(json_value)), ()):
+                matched_json_values[name] = json_value
+        return matched_json_values
+
+    def get_python_values_by_names(self, names: Sequence[str]) -> Tuple[InputType, ...]:
+        """
+        Gets the values with the specified names, using a single request to
+        the server for each batch of names.
+
+        :param names:
+                    The names to look for.
+        :return:
+                    The values, in the same order as their names.
+        """
+        return self.parse_json_values_by_names(names, self.get_json_values_by_names(names))
+
+    async def get_python_values_by_names_async(self, names: Sequence[str]) -> Tuple[InputType, ...]:
+        """
+        Gets the values with the specified names, requesting all batches of
+        names from the server concurrently.
+
+        :param names:
+                    The names to look for.
+        :return:
+                    The values, in the same order as their names.
+        """
+        return self.parse_json_values_by_names(names, await self.get_json_values_by_names_async(names))
+
+    def parse_json_values_by_names(
+            self,
+            names: Sequence[str],
+            json_values: Dict[str, RawJSONObject]
+    ) -> Tuple[InputType, ...]:
+        """
+        Parses the JSON values found for the given names.
+
+        :param names:
+                    The names.
+        :param json_values:
+                    The JSON values found for the names.
+        :return:
+                    The values, in the same order as their names.
+        """
+        for name in names:
+            if name not in json_values:
+                raise Exception(f"Failed to get JSON value by name \"{name}\"")
+        return tuple(
+            self.parse_json_value(json_values[name])
+            for name in names
+        )
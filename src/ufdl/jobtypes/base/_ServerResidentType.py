@@ -1,28 +1,184 @@
-from typing import List
+import asyncio
+from threading import Lock, RLock
+from typing import AbstractSet, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Type, TypeVar
+from weakref import WeakKeyDictionary
 
 from ufdl.json.core.filter import FilterExpression, FilterSpec
 
-from wai.json.raw import RawJSONElement
+from wai.json.object import StrictJSONObject
+from wai.json.raw import RawJSONElement, RawJSONObject
 
 from ._FiniteJSONType import FiniteJSONType, TypeArgsType, InputType, OutputType
+from ._TableSnapshot import TableSnapshot
+
+InstanceClassType = TypeVar('InstanceClassType', bound=Type[StrictJSONObject])
 
 
 class ServerResidentType(
     FiniteJSONType[TypeArgsType, InputType, OutputType]
 ):
+    # The specialised instance-classes of all server-resident types, keyed on the canonical
+    # type-string, so that equal types share a single class (and so a single validation schema)
+    _instance_classes: Dict[str, Type[StrictJSONObject]] = {}
+    _instance_classes_lock = RLock()
+
+    # The snapshot of the applicable rows of each type's table, when snapshots are enabled
+    _snapshots: 'WeakKeyDictionary[ServerResidentType, TableSnapshot]' = WeakKeyDictionary()
+    _snapshots_lock = Lock()
+
     def server_table_name(self) -> str:
         raise NotImplementedError(self.server_table_name.__name__)
 
     def filter_rules(self) -> List[FilterExpression]:
         raise NotImplementedError(self.filter_rules.__name__)
 
-    def list_all_json_values(self) -> List[RawJSONElement]:
+    def list_all_json_values(self) -> Sequence[RawJSONElement]:
+        """
+        Gets a list of all applicable values from the server, or from
+        the type's snapshot of its table if snapshots are enabled for it.
+        """
+        from ..initialise import table_snapshot_settings
+        settings = table_snapshot_settings(self.server_table_name())
+
+        if settings is None:
+            return self.get_filtered_list_of_json_values()
+
+        max_age, _ = settings
+        return self.snapshot().rows(max_age)
+
+    def listing_snapshot(self) -> Optional[Tuple[TableSnapshot, Optional[float]]]:
+        from ..initialise import table_snapshot_settings
+        settings = table_snapshot_settings(self.server_table_name())
+
+        if settings is None:
+            return None
+
+        return self.snapshot(), settings[0]
+
+    def snapshot(self) -> TableSnapshot:
+        """
+        Gets the snapshot of the applicable rows of this type's table.
+        """
+        from ..initialise import table_snapshot_settings
+        with ServerResidentType._snapshots_lock:
+            snapshot = ServerResidentType._snapshots.get(self, None)
+
+            if snapshot is None:
+                settings = table_snapshot_settings(self.server_table_name())
+                snapshot = ServerResidentType._snapshots[self] = TableSnapshot(
+                    self,
+                    settings[1] if settings is not None else None
+                )
+
+        return snapshot
+
+    @staticmethod
+    def clear_snapshots():
         """
-        Gets a list of all applicable values from the server.
+        Discards the table snapshots of all types.
         """
-        return self.get_filtered_list_of_json_values()
+        with ServerResidentType._snapshots_lock:
+            ServerResidentType._snapshots.clear()
 
-    def get_filtered_list_of_json_values(self, *filter_expressions: FilterExpression) -> List[RawJSONElement]:
+    def get_filtered_list_of_json_values(self, *filter_expressions: FilterExpression) -> Sequence[RawJSONElement]:
         from ..initialise import list_function
         filter_spec = FilterSpec(expressions=[*self.filter_rules(), *filter_expressions])
         return list_function(self.server_table_name(), filter_spec)
+
+    def get_filtered_list_of_json_values_from_server(self, *filter_expressions: FilterExpression) -> List[RawJSONElement]:
+        """
+        Gets a filtered list of the applicable values directly from the
+        server, bypassing any caching of list results.
+
+        :param filter_expressions:
+                    Any additional filters to apply.
+        :return:
+                    The listed values.
+        """
+        from ..initialise import list_function_from_server
+        filter_spec = FilterSpec(expressions=[*self.filter_rules(), *filter_expressions])
+        return list_function_from_server(self.server_table_name(), filter_spec)
+
+    async def list_all_json_values_async(self) -> Sequence[RawJSONElement]:
+        """
+        Gets a list of all applicable values from the server, without
+        blocking the event loop.
+        """
+        from ..initialise import table_snapshot_settings
+
+        if table_snapshot_settings(self.server_table_name()) is None:
+            return await self.get_filtered_list_of_json_values_async()
+
+        # Snapshots are refreshed synchronously, so do so in an executor
+        return await asyncio.get_running_loop().run_in_executor(None, self.list_all_json_values)
+
+    async def membership_index_async(self) -> AbstractSet[Hashable]:
+        """
+        Gets the membership index of all values of this type, without
+        blocking the event loop.
+        """
+        if self.listing_snapshot() is None:
+            return self.index_listing(await self.list_all_json_values_async())
+
+        # Snapshots are refreshed synchronously, so do so in an executor
+        return await asyncio.get_running_loop().run_in_executor(None, self.membership_index)
+
+    async def get_filtered_list_of_json_values_async(
+            self,
+            *filter_expressions: FilterExpression
+    ) -> Sequence[RawJSONElement]:
+        from ..initialise import list_function_async
+        filter_spec = FilterSpec(expressions=[*self.filter_rules(), *filter_expressions])
+        return await list_function_async(self.server_table_name(), filter_spec)
+
+    def shared_instance_class(self, generate: Callable[[], InstanceClassType]) -> InstanceClassType:
+        """
+        Gets the specialised instance-class for this type, generating it only if no
+        equal type has already done so.
+
+        :param generate:
+                    Generates the specialised instance-class.
+        :return:
+                    The instance-class shared by all types equal to this one.
+        """
+        key = str(self)
+
+        # Re-entrant, as specialising a class can require the instance-classes of the type arguments
+        with ServerResidentType._instance_classes_lock:
+            instance_class = ServerResidentType._instance_classes.get(key, None)
+
+            if instance_class is None:
+                instance_class = ServerResidentType._instance_classes[key] = generate()
+
+                # Specialised classes are created dynamically, so can't be pickled by reference;
+                # instead, their instances are pickled by type-string and raw JSON
+                def __reduce__(instance: StrictJSONObject):
+                    return rebuild_instance, (key, instance.to_raw_json())
+
+                instance_class.__reduce__ = __reduce__
+
+        return instance_class
+
+    @staticmethod
+    def clear_instance_class_cache():
+        """
+        Forgets all shared specialised instance-classes. Should be called whenever the
+        mapping from type-names to types changes.
+        """
+        with ServerResidentType._instance_classes_lock:
+            ServerResidentType._instance_classes.clear()
+
+
+def rebuild_instance(type_string: str, raw_json: RawJSONObject) -> StrictJSONObject:
+    """
+    Recreates an instance of a specialised instance-class when unpickling.
+
+    :param type_string:
+                The canonical type-string of the type which specialised the class.
+    :param raw_json:
+                The raw JSON of the instance.
+    :return:
+                The instance.
+    """
+    from ..util import parse_type
+    return parse_type(type_string).instance_class.from_raw_json(raw_json)
@@ -0,0 +1,258 @@
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from weakref import ref
+
+from ufdl.json.core.filter.field import Compare
+from wai.json.raw import RawJSONObject
+
+if TYPE_CHECKING:
+    from ._ServerResidentType import ServerResidentType
+
+# A change to a row, as the row before and after the change (None if absent)
+RowChange = Tuple[Optional[RawJSONObject], Optional[RawJSONObject]]
+
+# A position in a snapshot's log of changes, as the generation of the log and the offset into it
+ChangePosition = Tuple[int, int]
+
+# The minimum number of changes logged before the log can be compacted
+MIN_CHANGE_LOG_SIZE = 64
+
+
+class TableSnapshot:
+    """
+    Local copy of the rows of a server table which are applicable to a server-resident
+    type. After the first full listing, refreshing only requests the rows with primary-keys
+    greater than any seen so far, so the cost of a refresh scales with the number of
+    new rows rather than the size of the table. Rows which are returned as deleted are
+    dropped. Deletions and modifications of already-seen rows are only picked up by a
+    full refresh, which is performed periodically. Changes to the rows are logged, so
+    that anything derived from them can be updated without revisiting every row.
+    """
+    def __init__(
+            self,
+            server_type: 'ServerResidentType',
+            full_refresh_interval: Optional[float] = None
+    ):
+        """
+        :param server_type:
+                    The type whose applicable rows are copied.
+        :param full_refresh_interval:
+                    The number of seconds after which a refresh re-lists the whole
+                    table, or None to only do so when explicitly requested.
+        """
+        # Held weakly, as types hold their snapshots (weakly keyed on the type)
+        self._server_type: 'ref[ServerResidentType]' = ref(server_type)
+        self._full_refresh_interval: Optional[float] = full_refresh_interval
+
+        # The rows, keyed on primary-key
+        self._rows: Dict[int, RawJSONObject] = {}
+
+        # The highest primary-key seen, even if the row was deleted
+        self._max_pk: Optional[int] = None
+
+        # The (monotonic) times of the last refresh and the last full refresh
+        self._last_refresh: Optional[float] = None
+        self._last_full_refresh: Optional[float] = None
+
+        # The rows as a tuple, which remains the same object until the rows change
+        self._row_list: Optional[Tuple[RawJSONObject, ...]] = None
+
+        # The changes to the rows since the log was last compacted, and the number of compactions
+        self._changes: List[RowChange] = []
+        self._generation: int = 0
+
+        self._lock = Lock()
+
+    @property
+    def max_pk(self) -> Optional[int]:
+        """
+        The highest primary-key seen, or None if no rows have been seen.
+        """
+        return self._max_pk
+
+    @property
+    def last_refresh(self) -> Optional[float]:
+        """
+        The time.monotonic() time of the last refresh, or None if never refreshed.
+        """
+        return self._last_refresh
+
+    def age(self) -> Optional[float]:
+        """
+        Gets the number of seconds since the last refresh.
+
+        :return:
+                    The age, or None if never refreshed.
+        """
+        last_refresh = self._last_refresh
+        return time.monotonic() - last_refresh if last_refresh is not None else None
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Brings the snapshot up-to-date with the server.
+
+        :param full:
+                    Whether to re-list the whole table, rather than only the
+                    rows with primary-keys greater than any seen so far. A full
+                    refresh is always performed when no rows have been seen, or
+                    when the full-refresh interval has elapsed. When offline, only
+                    the first refresh lists the table (from the persistent cache).
+        :return:
+                    The number of rows that were added, changed or dropped.
+        """
+        from ..initialise import is_offline
+
+        server_type = self._server_type()
+        if server_type is None:
+            raise Exception("Can't refresh the snapshot of a type which no longer exists")
+
+        with self._lock:
+            now = time.monotonic()
+
+            full = (
+                full
+                or self._max_pk is None
+                or (
+                    self._full_refresh_interval is not None
+                    and now - self._last_full_refresh >= self._full_refresh_interval
+                )
+            )
+
+            # Offline, the table is listed from the persistent cache, which only holds full
+            # listings and doesn't change, so there is nothing new to list after the first
+            if is_offline() and self._last_refresh is not None:
+                changes = 0
+            elif full:
+                rows = server_type.get_filtered_list_of_json_values_from_server()
+                previous_rows = self._rows
+                self._rows = {}
+                self._max_pk = None
+                self.merge(rows, log=False)
+                changes = 0
+                for pk in previous_rows.keys() | self._rows.keys():
+                    old, new = previous_rows.get(pk, None), self._rows.get(pk, None)
+                    if old != new:
+                        self._changes.append((old, new))
+                        changes += 1
+                self._last_full_refresh = now
+            else:
+                changes = self.merge(
+                    server_type.get_filtered_list_of_json_values_from_server(
+                        Compare(field="pk", operator=">", value=self._max_pk)
+                    )
+                )
+
+            if changes > 0:
+                self._row_list = None
+
+            # Once there are more changes than rows, it is cheaper to start again from the rows
+            if len(self._changes) > max(len(self._rows), MIN_CHANGE_LOG_SIZE):
+                self._changes = []
+                self._generation += 1
+
+            self._last_refresh = now
+
+            return changes
+
+    def merge(self, rows: List[RawJSONObject], log: bool = True) -> int:
+        """
+        Merges listed rows into the snapshot, dropping those which have been deleted.
+
+        :param rows:
+                    The listed rows.
+        :param log:
+                    Whether to log the changes to the rows.
+        :return:
+                    The number of rows that were added, changed or dropped.
+        """
+        changes = 0
+        for row in rows:
+            pk = row['pk']
+
+            if self._max_pk is None or pk > self._max_pk:
+                self._max_pk = pk
+
+            old = self._rows.get(pk, None)
+
+            if is_deleted(row):
+                if old is None:
+                    continue
+                del self._rows[pk]
+                row = None
+            elif old != row:
+                self._rows[pk] = row
+            else:
+                continue
+
+            if log:
+                self._changes.append((old, row))
+            changes += 1
+
+        return changes
+
+    def rows(self, max_age: Optional[float] = None) -> Tuple[RawJSONObject, ...]:
+        """
+        Gets the rows of the snapshot, refreshing it first if it is older
+        than the given age. The same tuple is returned for as long as
+        the rows don't change.
+
+        :param max_age:
+                    The maximum number of seconds since the last refresh, or
+                    None to only refresh if the snapshot has never been refreshed.
+        :return:
+                    The rows, in primary-key order of first appearance.
+        """
+        self.ensure_fresh(max_age)
+
+        with self._lock:
+            if self._row_list is None:
+                self._row_list = tuple(self._rows.values())
+            return self._row_list
+
+    def ensure_fresh(self, max_age: Optional[float] = None):
+        """
+        Refreshes the snapshot if it is older than the given age.
+
+        :param max_age:
+                    The maximum number of seconds since the last refresh, or
+                    None to only refresh if the snapshot has never been refreshed.
+        """
+        age = self.age()
+        if age is None or (max_age is not None and age >= max_age):
+            self.refresh()
+
+    def changes_since(
+            self,
+            position: Optional[ChangePosition] = None
+    ) -> Tuple[ChangePosition, List[RowChange], bool]:
+        """
+        Gets the changes to the rows since a position in the log of changes. If
+        the log has been compacted since then, the changes are instead the
+        addition of every row, and anything derived from the rows should be
+        rebuilt from them.
+
+        :param position:
+                    The position returned by a previous call, or None to get
+                    all rows.
+        :return:
+                    The current position, the changes, and whether the changes
+                    are the addition of every row.
+        """
+        with self._lock:
+            current = self._generation, len(self._changes)
+
+            if position is None or position[0] != self._generation:
+                return current, [(None, row) for row in self._rows.values()], True
+
+            return current, self._changes[position[1]:], False
+
+
+def is_deleted(row: RawJSONObject) -> bool:
+    """
+    Whether a listed row represents a deleted value.
+
+    :param row:
+                The row.
+    """
+    return row.get('deletion_time', None) is not None
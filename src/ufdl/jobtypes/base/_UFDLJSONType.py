@@ -1,10 +1,11 @@
-import json
+from typing import Any, Optional, Sequence, Tuple
+from weakref import WeakKeyDictionary
 
 import jsonschema
 from wai.json.raw import RawJSONElement
 from wai.json.schema import JSONSchema
 
-from ._UFDLType import UFDLType, TypeArgsType, InputType, OutputType
+from ._UFDLType import UFDLType, TypeArgsType, InputType, OutputType, BinaryValue, BINARY_VALUE_TYPES
 from ..error import expect
 
 
@@ -14,9 +15,15 @@ class UFDLJSONType(
     """
     TODO
     """
-    def parse_binary_value(self, value: bytes) -> InputType:
-        expect(bytes, value)
-        return self.parse_json_value(json.loads(value))
+    # Cache of compiled schema validators, keyed on the (interned) type.
+    # Each entry also holds the schema the validator was compiled from, so that types
+    # whose schema changes (e.g. those listing values from the server) are recompiled
+    _validators: 'WeakKeyDictionary[UFDLJSONType, Tuple[JSONSchema, Any]]' = WeakKeyDictionary()
+
+    def parse_binary_value(self, value: BinaryValue) -> InputType:
+        from ..initialise import json_loads
+        expect(BINARY_VALUE_TYPES, value)
+        return self.parse_json_value(json_loads(value))
 
     def parse_json_value(self, value: RawJSONElement) -> InputType:
         """
@@ -29,8 +36,56 @@ class UFDLJSONType(
         """
         raise NotImplementedError(self.parse_json_value.__name__)
 
+    def parse_json_values(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        """
+        Parses a number of raw values supplied as JSON into the Python-type.
+        Types which can parse many values more efficiently than one at a time
+        (e.g. with a single request to the server) should override this.
+
+        :param values:
+                    The values to parse, as JSON.
+        :return:
+                    The values parsed into Python, in the same order.
+        """
+        return tuple(
+            self.parse_json_value(value)
+            for value in values
+        )
+
+    async def parse_binary_value_async(self, value: BinaryValue) -> InputType:
+        from ..initialise import json_loads
+        expect(BINARY_VALUE_TYPES, value)
+        return await self.parse_json_value_async(json_loads(value))
+
+    async def parse_json_value_async(self, value: RawJSONElement) -> InputType:
+        """
+        Parses a raw value supplied as JSON into the Python-type, without blocking
+        the event loop while waiting on the server. By default the value is parsed
+        by parse_json_value.
+
+        :param value:
+                    The value to parse, as JSON.
+        :return:
+                    The value parsed into Python.
+        """
+        return self.parse_json_value(value)
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        """
+        Parses a number of raw values supplied as JSON into the Python-type, without
+        blocking the event loop while waiting on the server. By default the values
+        are parsed by parse_json_values.
+
+        :param values:
+                    The values to parse, as JSON.
+        :return:
+                    The values parsed into Python, in the same order.
+        """
+        return self.parse_json_values(values)
+
     def format_python_value(self, value: OutputType) -> bytes:
-        return json.dumps(self.format_python_value_to_json(value)).encode("UTF-8")
+        from ..initialise import json_dumps
+        return json_dumps(self.format_python_value_to_json(value))
 
     def format_python_value_to_json(self, value: OutputType) -> RawJSONElement:
         """
@@ -50,16 +105,25 @@ class UFDLJSONType(
         """
         raise NotImplementedError(self.json_schema.__name__)
 
-    def validate_with_schema(self, value: RawJSONElement):
+    def get_validator(self) -> Any:
         """
-        Uses the type's schema to validate a value.
+        Gets a validator for the type's schema. The schema is only checked and the
+        validator only created the first time it is seen for this type; subsequent
+        calls reuse the cached validator for as long as the schema remains the same.
 
-        :param value:
-                    The value to validate.
+        :return:
+                    The validator.
         """
         # Get our schema
         schema = self.json_schema
 
+        # Reuse the cached validator if it was compiled from the same schema
+        cached = UFDLJSONType._validators.get(self, None)
+        if cached is not None:
+            cached_schema, validator = cached
+            if cached_schema is schema or cached_schema == schema:
+                return validator
+
         # Get the validator class
         validator_type = jsonschema.validators.validator_for(schema)
 
@@ -69,5 +133,29 @@ class UFDLJSONType(
         # Create the instance
         validator = validator_type(schema)
 
-        # Perform schema validation
-        validator.validate(value)
+        UFDLJSONType._validators[self] = schema, validator
+
+        return validator
+
+    @staticmethod
+    def clear_validator_cache(type: Optional['UFDLJSONType'] = None):
+        """
+        Removes compiled validators from the cache.
+
+        :param type:
+                    The type to remove the validator for, or None to clear
+                    the validators for all types.
+        """
+        if type is None:
+            UFDLJSONType._validators.clear()
+        else:
+            UFDLJSONType._validators.pop(type, None)
+
+    def validate_with_schema(self, value: RawJSONElement):
+        """
+        Uses the type's schema to validate a value.
+
+        :param value:
+                    The value to validate.
+        """
+        self.get_validator().validate(value)
@@ -1,4 +1,6 @@
-from typing import Generic, Optional, Tuple, TypeVar
+from threading import Lock
+from typing import IO, Generic, Optional, Tuple, TypeVar, Union
+from weakref import WeakKeyDictionary, WeakValueDictionary
 
 from wai.common.meta import instanceoptionalmethod
 
@@ -13,10 +15,37 @@ TypeArgsType = TypeVar(
 InputType = TypeVar('InputType')
 OutputType = TypeVar('OutputType')
 
+# The Python types which binary values can be supplied as
+BinaryValue = Union[bytes, bytearray]
+BINARY_VALUE_TYPES = bytes, bytearray
 
-class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
+
+class UFDLTypeMeta(type):
+    """
+    Meta-class for UFDL types which interns type instances, so that constructing
+    a type which is structurally equal to an existing type returns the existing
+    instance.
+    """
+    # The live type instances, keyed on their class and type arguments
+    _interned = WeakValueDictionary()
+    _interned_lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        instance = super().__call__(*args, **kwargs)
+
+        key = (cls, instance._type_args)
+        with UFDLTypeMeta._interned_lock:
+            interned = UFDLTypeMeta._interned.get(key, None)
+            if interned is None:
+                UFDLTypeMeta._interned[key] = interned = instance
+
+        return interned
+
+
+class UFDLType(Generic[TypeArgsType, InputType, OutputType], metaclass=UFDLTypeMeta):
     """
-    Base class for all types used by the UFDL system.
+    Base class for all types used by the UFDL system. Instances are interned, so
+    equal types are always the same object and can be compared by identity.
     """
     def __init_subclass__(cls, **kwargs):
         base_types = cls.type_params_expected_base_types()
@@ -59,18 +88,28 @@ class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
 
         self._type_args: TypeArgsType = type_args
 
+        # Type arguments are themselves interned, so their hashes are already computed
+        self._hash: int = hash((type(self), type_args))
+
+        # Memoised results of is_subtype_of, keyed on the other type. Weakly keyed,
+        # so that the cache doesn't keep otherwise-unused (interned) types alive
+        self._subtype_cache: 'WeakKeyDictionary[UFDLType, bool]' = WeakKeyDictionary()
+
     @property
     def type_args(self) -> TypeArgsType:
         return self._type_args
 
     def __eq__(self, other):
-        return (
-            isinstance(other, UFDLType)
-            and
-            type(self) == type(other)
-            and
-            self._type_args == other._type_args
-        )
+        return self is other
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # Types may be instances of dynamically-created classes, so are
+        # pickled by their type-string and re-parsed when unpickled
+        from ..util import parse_type
+        return parse_type, (str(self),)
 
     def is_subtype_of(self, other: 'UFDLType') -> bool:
         """
@@ -79,14 +118,19 @@ class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
         :param other:
                     The type to check for inheritance.
         """
-        return (
-                isinstance(self, type(other))
-                and
-                all(
-                        type_arg.is_subtype_of(other_type_arg)
-                        for type_arg, other_type_arg in zip(self._type_args, other._type_args)
-                )
-        )
+        result = self._subtype_cache.get(other, None)
+
+        if result is None:
+            result = self._subtype_cache[other] = (
+                    isinstance(self, type(other))
+                    and
+                    all(
+                            type_arg.is_subtype_of(other_type_arg)
+                            for type_arg, other_type_arg in zip(self._type_args, other._type_args)
+                    )
+            )
+
+        return result
 
     @classmethod
     def type_params_expected_base_types(cls) -> Tuple['UFDLType', ...]:
@@ -102,7 +146,7 @@ class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
         """
         return tuple()
 
-    def parse_binary_value(self, value: bytes) -> InputType:
+    def parse_binary_value(self, value: BinaryValue) -> InputType:
         """
         Parses a raw value supplied as binary into the Python-type.
 
@@ -113,6 +157,43 @@ class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
         """
         raise NotImplementedError(self.parse_binary_value.__name__)
 
+    def parse_binary_stream(self, stream: IO[bytes]) -> InputType:
+        """
+        Parses a raw value supplied as a binary stream into the Python-type.
+        Types which can consume their value without reading it all into
+        memory should override this; by default the stream is read in full
+        and parsed by parse_binary_value.
+
+        :param stream:
+                    A readable binary file-like object containing the value.
+        :return:
+                    The value parsed into Python.
+        """
+        return self.parse_binary_value(stream.read())
+
+    @property
+    def requires_seekable_stream(self) -> bool:
+        """
+        Whether parse_binary_stream needs to seek within the stream, rather than only
+        reading it forwards. Streams which can't seek are read into memory by such types,
+        so their values should be spooled before being parsed from a stream.
+        """
+        return False
+
+    async def parse_binary_value_async(self, value: BinaryValue) -> InputType:
+        """
+        Parses a raw value supplied as binary into the Python-type, without blocking
+        the event loop while waiting on the server. Types which look up values on the
+        server (directly or in their type arguments) should override this; by default
+        the value is parsed by parse_binary_value.
+
+        :param value:
+                    The value to parse, as binary.
+        :return:
+                    The value parsed into Python.
+        """
+        return self.parse_binary_value(value)
+
     def format_python_value(self, value: OutputType) -> bytes:
         """
         Formats a Python value into binary.
@@ -124,6 +205,19 @@ class UFDLType(Generic[TypeArgsType, InputType, OutputType]):
         """
         raise NotImplementedError(self.format_python_value.__name__)
 
+    def format_python_value_to_stream(self, value: OutputType, stream: IO[bytes]):
+        """
+        Formats a Python value into binary, writing it to a stream. Types which
+        can produce their binary form without holding it all in memory should
+        override this; by default the value is formatted by format_python_value.
+
+        :param value:
+                    The value to format.
+        :param stream:
+                    A writable binary file-like object to write the serialised value to.
+        """
+        stream.write(self.format_python_value(value))
+
     def __str__(self) -> str:
         return self.format()
 
@@ -1,6 +1,9 @@
-from typing import Optional, Tuple, Type, Union
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Optional, Tuple, Type, Union
 from weakref import WeakValueDictionary
 
+from jsonschema import ValidationError
 from wai.json.raw import RawJSONElement
 from wai.json.schema import JSONSchema, any_of, string_schema, number, BOOL_SCHEMA, constant
 
@@ -23,8 +26,60 @@ FALSE_CONST_SYMBOL = "@false"
 VALUE_TYPES = str, int, float, bool
 
 
+def is_integer(value: Any) -> bool:
+    # As for JSON-schema, booleans are not integers but integral floats are
+    return (
+        isinstance(value, int) and not isinstance(value, bool)
+        or
+        isinstance(value, float) and value.is_integer()
+    )
+
+
+def is_number(value: Any) -> bool:
+    # As for JSON-schema, booleans are not numbers
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def native_check(value: AnyValueType) -> Tuple[Callable[[Any], bool], str, Any]:
+    """
+    Creates a check equivalent to the JSON-schema for a value-type, which can
+    be performed without a schema validator.
+
+    :param value:
+                The value (or Python type of value) of the value-type.
+    :return:
+                The check, and the JSON-schema keyword and keyword value which
+                the check is equivalent to.
+    """
+    if value is str:
+        return (lambda v: isinstance(v, str)), "type", "string"
+    elif value is int:
+        return is_integer, "type", "integer"
+    elif value is float:
+        return is_number, "type", "number"
+    elif value is bool:
+        return (lambda v: isinstance(v, bool)), "type", "boolean"
+    elif isinstance(value, str):
+        return (lambda v: isinstance(v, str) and v == value), "const", value
+    elif isinstance(value, bool):
+        return (lambda v: v is value), "const", value
+    else:
+        return (lambda v: is_number(v) and v == value), "const", value
+
+
 class ValueType(UFDLJSONType[Tuple[()], AnyValue, AnyValue]):
+    # The generated sub-classes, keyed on the type of the value as well as the value,
+    # as values of different types can compare equal (e.g. True, 1 and 1.0)
     _instances = WeakValueDictionary()
+
+    # Strong references to the most recently used sub-classes, so that they (and their
+    # schemas) aren't recreated each time their last instance is garbage-collected
+    _recent_instances: 'OrderedDict[Tuple[type, AnyValueType], Type[ValueType]]' = OrderedDict()
+    RECENT_INSTANCES_SIZE: int = 1024
+
+    # Guards the above, as sub-classes may be generated from multiple threads
+    _instances_lock = Lock()
+
     _value: Optional[AnyValueType] = None
 
     @classmethod
@@ -33,8 +88,11 @@ class ValueType(UFDLJSONType[Tuple[()], AnyValue, AnyValue]):
 
     @staticmethod
     def generate_subclass(value: AnyValueType) -> Type['ValueType']:
-        if value in ValueType._instances:
-            return ValueType._instances[value]
+        key = type(value), value
+        existing = ValueType._instances.get(key, None)
+        if existing is not None:
+            ValueType.remember_subclass(key, existing)
+            return existing
 
         schema = (
             string_schema() if value is str
@@ -48,6 +106,8 @@ class ValueType(UFDLJSONType[Tuple[()], AnyValue, AnyValue]):
         if schema is None:
             raise Exception(f"Can't generate value-schema for {value}")
 
+        check, keyword, keyword_value = native_check(value)
+
         base_class = (
             ValueType[Tuple[()], value, value] if isinstance(value, type)
             else ValueType.generate_subclass(type(value))
@@ -60,6 +120,18 @@ class ValueType(UFDLJSONType[Tuple[()], AnyValue, AnyValue]):
             def json_schema(self) -> JSONSchema:
                 return schema
 
+            def validate_with_schema(self, value: RawJSONElement):
+                # Equivalent to validating against the schema, without the overhead of a validator
+                if not check(value):
+                    raise ValidationError(
+                        f"{value!r} is not of type '{keyword_value}'" if keyword == "type" else
+                        f"{keyword_value!r} was expected",
+                        validator=keyword,
+                        validator_value=keyword_value,
+                        instance=value,
+                        schema=schema
+                    )
+
             def __str__(self) -> str:
                 # Simple type parameters are represented by their type name
                 if value in VALUE_TYPES:
@@ -82,9 +154,32 @@ class ValueType(UFDLJSONType[Tuple[()], AnyValue, AnyValue]):
 
                 raise Exception("Should never reach here")
 
-        ValueType._instances[value] = SpecialisedValueType
+        # Another thread may have generated the sub-class in the meantime, in which case
+        # that sub-class is used instead, so that each value only ever has one sub-class
+        with ValueType._instances_lock:
+            subclass = ValueType._instances.setdefault(key, SpecialisedValueType)
+
+        ValueType.remember_subclass(key, subclass)
 
-        return SpecialisedValueType
+        return subclass
+
+    @staticmethod
+    def remember_subclass(key: Tuple[type, AnyValueType], subclass: Type['ValueType']):
+        """
+        Keeps a strong reference to a recently-used sub-class, discarding the
+        least-recently used one if too many are held.
+
+        :param key:
+                    The type and value of the sub-class.
+        :param subclass:
+                    The sub-class.
+        """
+        with ValueType._instances_lock:
+            recent_instances = ValueType._recent_instances
+            recent_instances[key] = subclass
+            recent_instances.move_to_end(key)
+            if len(recent_instances) > ValueType.RECENT_INSTANCES_SIZE:
+                recent_instances.popitem(last=False)
 
     def parse_json_value(self, value: RawJSONElement):
         self.validate_with_schema(value)
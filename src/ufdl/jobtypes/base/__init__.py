@@ -4,8 +4,9 @@ The base hierarchy of types that the UFDL server uses for jobs.
 from ._FiniteJSONType import FiniteJSONType
 from ._NamedServerType import NamedServerType
 from ._ServerResidentType import ServerResidentType
+from ._TableSnapshot import TableSnapshot
 from ._UFDLJSONType import UFDLJSONType
-from ._UFDLType import UFDLType, TypeArgsType, InputType, OutputType
+from ._UFDLType import UFDLType, TypeArgsType, InputType, OutputType, BinaryValue, BINARY_VALUE_TYPES
 from ._ValueType import (
     ValueType,
     TRUE_CONST_SYMBOL,
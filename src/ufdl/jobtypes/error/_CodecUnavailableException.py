@@ -0,0 +1,7 @@
+class CodecUnavailableException(Exception):
+    """
+    Exception for when a value is compressed with a codec whose (optional)
+    library is not installed.
+    """
+    def __init__(self, codec: str, package: str):
+        super().__init__(f"Codec '{codec}' requires the '{package}' package, which is not installed")
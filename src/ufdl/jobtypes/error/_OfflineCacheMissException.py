@@ -0,0 +1,7 @@
+class OfflineCacheMissException(Exception):
+    """
+    Exception for when a value is required from the server while working
+    offline, but it is not in the persistent cache.
+    """
+    def __init__(self, table_name: str, request: str):
+        super().__init__(f"No cached result for {request} of table '{table_name}' while offline")
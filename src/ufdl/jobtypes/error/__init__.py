@@ -1,9 +1,11 @@
 """
 The types of errors that this library can raise.
 """
+from ._CodecUnavailableException import CodecUnavailableException
 from ._ExpectationError import ExpectationError, expect
 from ._IsNotSubtypeException import IsNotSubtypeException
 from ._NotInitialisedException import NotInitialisedException
+from ._OfflineCacheMissException import OfflineCacheMissException
 from ._SupportsNoInputException import SupportsNoInputException
 from ._TypeDoesNotSupportBinaryException import TypeDoesNotSupportBinaryException
 from ._TypeDoesNotSupportJSONException import TypeDoesNotSupportJSONException
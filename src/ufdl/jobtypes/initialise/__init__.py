@@ -6,11 +6,44 @@ provide implementations that make REST API calls to the server instance.
 """
 from ._initialisation import (
     initialise_server,
+    initialise_server_async,
     name_translate,
     type_translate,
+    registered_subtypes,
+    registered_supertypes,
+    enable_list_cache,
+    disable_list_cache,
+    invalidate_list_cache,
+    list_cache_statistics,
+    enable_table_snapshots,
+    disable_table_snapshots,
+    table_snapshot_settings,
+    enable_persistent_cache,
+    disable_persistent_cache,
+    invalidate_persistent_cache,
+    purge_persistent_cache_downloads,
+    is_offline,
+    persistent_cache_statistics,
+    single_flight_statistics,
     list_function,
+    list_function_from_server,
     download_function,
+    list_function_async,
+    download_function_async,
     ListFunction,
-    DownloadFunction
+    DownloadFunction,
+    AsyncListFunction,
+    AsyncDownloadFunction,
+    SizedDownload
 )
+from ._json_backend import (
+    initialise_json_backend,
+    json_backend,
+    json_loads,
+    json_dumps,
+    JSON_BACKENDS
+)
+from ._list_cache import ListCache, ListCacheStatistics
 from ._not_initialised import not_initialised
+from ._persistent_cache import PersistentCache, PersistentCacheStatistics
+from ._single_flight import SingleFlight, SingleFlightStatistics
@@ -1,26 +1,92 @@
+import asyncio
 import builtins
-from typing import Callable, Dict, Iterator, List, Optional, Type, Union
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union
+)
+from weakref import WeakKeyDictionary
 
 from ufdl.json.core.filter import FilterSpec
 
 from wai.json.raw import RawJSONObject
 
-from ..base import UFDLType
+from ..base import ServerResidentType, UFDLType
 from ..error import NotInitialisedException
+from ._list_cache import ListCache, ListCacheStatistics
 from ._not_initialised import not_initialised
+from ._persistent_cache import PersistentCache, PersistentCacheStatistics
+from ._single_flight import SingleFlight, SingleFlightStatistics
+from ._sized_download import SizedDownload
 
 # Types
 ListFunction = Callable[[str, FilterSpec], List[RawJSONObject]]
-DownloadFunction = Callable[[str, int], Union[bytes, Iterator[bytes]]]
+DownloadFunction = Callable[[str, int], Union[bytes, Iterator[bytes], SizedDownload]]
+AsyncListFunction = Callable[[str, FilterSpec], Awaitable[List[RawJSONObject]]]
+AsyncDownloadFunction = Callable[[str, int], Awaitable[Union[bytes, Iterator[bytes], AsyncIterator[bytes], SizedDownload]]]
 
 # Name/type mappings
 NAME_TO_TYPE_MAP: Optional[Dict[str, type]] = None
 TYPE_TO_NAME_MAP: Optional[Dict[type, str]] = None
 
+# Index from each class in the MRO of a registered type to the registered types which inherit from it
+DESCENDANTS_INDEX: Optional[Dict[type, Tuple[Type[UFDLType], ...]]] = None
+
+# The most-general instance of each registered type, created on demand
+GENERAL_INSTANCES: Dict[Type[UFDLType], UFDLType] = {}
+
 # Server interaction functions
 LIST_FUNCTION: ListFunction = not_initialised()
 DOWNLOAD_FUNCTION: DownloadFunction = not_initialised()
 
+# Asynchronous server interaction functions. If None, the synchronous functions
+# are run in the event loop's default executor instead
+ASYNC_LIST_FUNCTION: Optional[AsyncListFunction] = None
+ASYNC_DOWNLOAD_FUNCTION: Optional[AsyncDownloadFunction] = None
+
+# The maximum number of asynchronous requests to the server which can be in progress at once
+DEFAULT_MAX_CONCURRENT_REQUESTS: int = 8
+MAX_CONCURRENT_REQUESTS: int = DEFAULT_MAX_CONCURRENT_REQUESTS
+
+# The semaphore limiting concurrent requests in each event loop
+REQUEST_SEMAPHORES: 'WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = WeakKeyDictionary()
+
+# Optional cache of list results
+LIST_CACHE: Optional[ListCache] = None
+
+# The maximum age and full-refresh interval of table snapshots, if enabled, and
+# the tables they are enabled for (None for all tables)
+SNAPSHOT_SETTINGS: Optional[Tuple[Optional[float], Optional[float]]] = None
+SNAPSHOT_TABLES: Optional[FrozenSet[str]] = None
+
+# Optional on-disk cache of list results and downloads, which persists between processes
+PERSISTENT_CACHE: Optional[PersistentCache] = None
+
+
+def is_shareable_download(result: Union[bytes, Iterator[bytes], SizedDownload]) -> bool:
+    """
+    Whether a downloaded result can be shared between requests. Streamed
+    downloads can only be consumed once, so aren't shared.
+    """
+    return isinstance(result, bytes)
+
+
+# Coalescing of identical concurrent server requests. Requests which bypass the
+# caches are keyed separately, so they never receive a cached result
+SERVER_FLIGHT = "server"
+LIST_FLIGHTS: SingleFlight = SingleFlight()
+DOWNLOAD_FLIGHTS: SingleFlight = SingleFlight(is_shareable_download)
+
 
 def initialise_server(
         list_function: ListFunction,
@@ -30,12 +96,72 @@ def initialise_server(
     """
     Initialises the type-systems connection to the server.
     """
-    global NAME_TO_TYPE_MAP, TYPE_TO_NAME_MAP
-    global LIST_FUNCTION, DOWNLOAD_FUNCTION
+    global LIST_FUNCTION, DOWNLOAD_FUNCTION, ASYNC_LIST_FUNCTION, ASYNC_DOWNLOAD_FUNCTION, MAX_CONCURRENT_REQUESTS
+    global LIST_FLIGHTS, DOWNLOAD_FLIGHTS
 
     LIST_FUNCTION = list_function
     DOWNLOAD_FUNCTION = download_function
 
+    # Requests to the new server are coalesced separately
+    LIST_FLIGHTS = SingleFlight()
+    DOWNLOAD_FLIGHTS = SingleFlight(is_shareable_download)
+
+    # Asynchronous requests run the synchronous functions in an executor
+    ASYNC_LIST_FUNCTION = None
+    ASYNC_DOWNLOAD_FUNCTION = None
+    MAX_CONCURRENT_REQUESTS = DEFAULT_MAX_CONCURRENT_REQUESTS
+    REQUEST_SEMAPHORES.clear()
+
+    initialise_type_names(name_to_type_map)
+
+
+def initialise_server_async(
+        list_function: AsyncListFunction,
+        download_function: AsyncDownloadFunction,
+        name_to_type_map: Dict[str, Type[UFDLType]],
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS
+):
+    """
+    Initialises the type-systems connection to the server, for use by the
+    asynchronous parsing methods. The synchronous server functions are left
+    as they are, so both can be used by calling initialise_server first.
+
+    :param list_function:
+                Coroutine function which lists a table on the server.
+    :param download_function:
+                Coroutine function which downloads a value from the server.
+    :param name_to_type_map:
+                The mapping from type-names to types.
+    :param max_concurrent_requests:
+                The maximum number of requests to the server which can be
+                in progress at once in each event loop.
+    """
+    global ASYNC_LIST_FUNCTION, ASYNC_DOWNLOAD_FUNCTION, MAX_CONCURRENT_REQUESTS
+
+    if max_concurrent_requests < 1:
+        raise ValueError(f"Maximum number of concurrent requests must be positive; got {max_concurrent_requests}")
+
+    ASYNC_LIST_FUNCTION = list_function
+    ASYNC_DOWNLOAD_FUNCTION = download_function
+    MAX_CONCURRENT_REQUESTS = max_concurrent_requests
+    REQUEST_SEMAPHORES.clear()
+
+    initialise_type_names(name_to_type_map)
+
+
+def initialise_type_names(name_to_type_map: Dict[str, Type[UFDLType]]):
+    """
+    Sets the mapping between type-names and types.
+
+    :param name_to_type_map:
+                The mapping from type-names to types.
+    """
+    global NAME_TO_TYPE_MAP, TYPE_TO_NAME_MAP, DESCENDANTS_INDEX, LIST_CACHE
+
+    # Results cached from a previous server are no longer valid
+    if LIST_CACHE is not None:
+        LIST_CACHE.invalidate()
+
     # Verify and reverse the name/type mapping
     NAME_TO_TYPE_MAP = {}
     TYPE_TO_NAME_MAP = {}
@@ -59,6 +185,23 @@ def initialise_server(
         NAME_TO_TYPE_MAP[name] = type
         TYPE_TO_NAME_MAP[type] = name
 
+    # Index the registered types by the classes they inherit from
+    descendants: Dict[type, List[Type[UFDLType]]] = {}
+    for type in TYPE_TO_NAME_MAP:
+        for base in type.__mro__:
+            descendants.setdefault(base, []).append(type)
+    DESCENDANTS_INDEX = {
+        base: tuple(types)
+        for base, types in descendants.items()
+    }
+    GENERAL_INSTANCES.clear()
+
+    # Previously-parsed type-strings may now refer to different types
+    from ..util import clear_parse_cache
+    clear_parse_cache()
+    ServerResidentType.clear_instance_class_cache()
+    ServerResidentType.clear_snapshots()
+
 
 def name_translate(name: str) -> Optional[Type[UFDLType]]:
     """
@@ -92,11 +235,459 @@ def type_translate(type: Type[UFDLType]) -> Optional[str]:
     return TYPE_TO_NAME_MAP.get(type, None)
 
 
-def list_function(table_name: str, filter: FilterSpec) -> List[RawJSONObject]:
-    global LIST_FUNCTION
-    return LIST_FUNCTION(table_name, filter)
+def registered_subtypes(ufdl_type: UFDLType) -> List[UFDLType]:
+    """
+    Gets all registered types which are sub-types of the given type. Only those
+    registered types which inherit from the class of the given type are checked.
+
+    :param ufdl_type:
+                The type to find the sub-types of.
+    :return:
+                The most-general instance of each registered sub-type.
+    """
+    global DESCENDANTS_INDEX
+    if DESCENDANTS_INDEX is None:
+        raise NotInitialisedException()
+    return [
+        general_instance
+        for general_instance in map(general_instance_of, DESCENDANTS_INDEX.get(builtins.type(ufdl_type), ()))
+        if general_instance.is_subtype_of(ufdl_type)
+    ]
+
+
+def registered_supertypes(ufdl_type: UFDLType) -> List[UFDLType]:
+    """
+    Gets all registered types which are super-types of the given type. Only those
+    registered types in the MRO of the class of the given type are checked.
+
+    :param ufdl_type:
+                The type to find the super-types of.
+    :return:
+                The most-general instance of each registered super-type.
+    """
+    global TYPE_TO_NAME_MAP
+    if TYPE_TO_NAME_MAP is None:
+        raise NotInitialisedException()
+    return [
+        general_instance
+        for general_instance in map(
+            general_instance_of,
+            (base for base in builtins.type(ufdl_type).__mro__ if base in TYPE_TO_NAME_MAP)
+        )
+        if ufdl_type.is_subtype_of(general_instance)
+    ]
+
+
+def general_instance_of(type: Type[UFDLType]) -> UFDLType:
+    """
+    Gets the most-general instance of a registered type, i.e. the instance
+    with the default base-types as its type arguments.
+
+    :param type:
+                The registered type.
+    :return:
+                The most-general instance of the type.
+    """
+    general_instance = GENERAL_INSTANCES.get(type, None)
+    if general_instance is None:
+        general_instance = GENERAL_INSTANCES[type] = type()
+    return general_instance
+
+
+def enable_list_cache(
+        default_ttl: float = 60.0,
+        table_ttls: Optional[Dict[str, float]] = None,
+        max_size: int = 1024
+):
+    """
+    Enables caching of the results of list_function, so that repeatedly listing
+    the same table with the same filter is served from memory. Replaces any
+    previously-enabled cache.
+
+    :param default_ttl:
+                The number of seconds that list results are cached for.
+    :param table_ttls:
+                Overrides of the time-to-live for specific tables. A time-to-live
+                of zero disables caching for that table.
+    :param max_size:
+                The maximum number of list results to cache.
+    """
+    global LIST_CACHE
+    LIST_CACHE = ListCache(default_ttl, table_ttls, max_size)
+
+
+def disable_list_cache():
+    """
+    Disables caching of the results of list_function.
+    """
+    global LIST_CACHE
+    LIST_CACHE = None
+
+
+def invalidate_list_cache(table_name: Optional[str] = None):
+    """
+    Discards cached list results.
+
+    :param table_name:
+                The table to discard the results for, or None to discard
+                all cached results.
+    """
+    global LIST_CACHE
+    if LIST_CACHE is not None:
+        LIST_CACHE.invalidate(table_name)
+
+
+def list_cache_statistics() -> Optional[ListCacheStatistics]:
+    """
+    Gets the hit/miss counters of the list cache.
+
+    :return:
+                The statistics, or None if caching is not enabled.
+    """
+    global LIST_CACHE
+    return LIST_CACHE.statistics if LIST_CACHE is not None else None
+
+
+def enable_table_snapshots(
+        max_age: Optional[float] = 60.0,
+        full_refresh_interval: Optional[float] = 3600.0,
+        tables: Optional[Iterable[str]] = None
+):
+    """
+    Enables keeping a snapshot of the applicable rows of each server-resident type's table,
+    which is refreshed by requesting only rows newer than those already seen. Suited to
+    append-mostly tables (e.g. job-outputs, datasets); deletions and modifications of
+    existing rows are only seen at the next full refresh. Replaces any existing snapshots.
+
+    :param max_age:
+                The number of seconds after which a snapshot is refreshed when its rows
+                are next required, or None to only refresh snapshots explicitly.
+    :param full_refresh_interval:
+                The number of seconds after which a refresh re-lists the whole table,
+                or None to only do so explicitly.
+    :param tables:
+                The tables to keep snapshots of, or None for all tables.
+    """
+    global SNAPSHOT_SETTINGS, SNAPSHOT_TABLES
+    SNAPSHOT_SETTINGS = max_age, full_refresh_interval
+    SNAPSHOT_TABLES = frozenset(tables) if tables is not None else None
+    ServerResidentType.clear_snapshots()
+
+
+def disable_table_snapshots():
+    """
+    Disables table snapshots, so that listings always go to the server
+    (or the list caches).
+    """
+    global SNAPSHOT_SETTINGS, SNAPSHOT_TABLES
+    SNAPSHOT_SETTINGS = None
+    SNAPSHOT_TABLES = None
+    ServerResidentType.clear_snapshots()
+
+
+def table_snapshot_settings(table_name: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    """
+    Gets the snapshot settings for a table.
+
+    :param table_name:
+                The table.
+    :return:
+                The maximum age and full-refresh interval of the table's
+                snapshots, or None if the table isn't snapshotted.
+    """
+    global SNAPSHOT_SETTINGS, SNAPSHOT_TABLES
+    if SNAPSHOT_SETTINGS is None or (SNAPSHOT_TABLES is not None and table_name not in SNAPSHOT_TABLES):
+        return None
+    return SNAPSHOT_SETTINGS
+
+
+def enable_persistent_cache(
+        directory: str,
+        default_max_age: Optional[float] = 3600.0,
+        table_max_ages: Optional[Dict[str, Optional[float]]] = None,
+        offline: bool = False,
+        max_download_size: Optional[int] = None
+):
+    """
+    Enables caching of list results and downloads on disk, so that they are available
+    to later processes. List results are only used while they are fresh (unless offline);
+    downloads are always used, as the data for a primary-key doesn't change, until they
+    are evicted or purged. Replaces any previously-enabled persistent cache. The cache is
+    not cleared by initialise_server, so each server should be given its own directory.
+
+    :param directory:
+                The directory to keep the cache in. Created if it doesn't exist.
+    :param default_max_age:
+                The number of seconds that list results remain fresh, or None
+                if they never go stale.
+    :param table_max_ages:
+                Overrides of the maximum age for specific tables. A maximum age
+                of zero disables persistent caching of that table's list results.
+    :param offline:
+                Whether to never contact the server, using the cached results regardless
+                of their age. Requests which aren't in the cache raise OfflineCacheMissException.
+    :param max_download_size:
+                The maximum total number of bytes of cached downloads, beyond which the
+                least recently used downloads are discarded, or None for no bound.
+    """
+    global PERSISTENT_CACHE
+    disable_persistent_cache()
+    PERSISTENT_CACHE = PersistentCache(directory, default_max_age, table_max_ages, offline, max_download_size)
+
+
+def disable_persistent_cache():
+    """
+    Disables caching of list results and downloads on disk. The cached
+    data remains in the cache directory.
+    """
+    global PERSISTENT_CACHE
+    if PERSISTENT_CACHE is not None:
+        PERSISTENT_CACHE.close()
+        PERSISTENT_CACHE = None
+
+
+def invalidate_persistent_cache(table_name: Optional[str] = None):
+    """
+    Discards list results from the persistent cache.
+
+    :param table_name:
+                The table to discard the results for, or None to discard
+                all cached list results.
+    """
+    global PERSISTENT_CACHE
+    if PERSISTENT_CACHE is not None:
+        PERSISTENT_CACHE.invalidate(table_name)
+
+
+def purge_persistent_cache_downloads(table_name: Optional[str] = None):
+    """
+    Discards downloaded data from the persistent cache.
+
+    :param table_name:
+                The table to discard the downloads for, or None to discard
+                all cached downloads.
+    """
+    global PERSISTENT_CACHE
+    if PERSISTENT_CACHE is not None:
+        PERSISTENT_CACHE.purge_downloads(table_name)
+
+
+def is_offline() -> bool:
+    """
+    Whether the server is never contacted, as the persistent cache is
+    enabled in offline mode.
+    """
+    global PERSISTENT_CACHE
+    persistent_cache = PERSISTENT_CACHE
+    return persistent_cache is not None and persistent_cache.offline
+
+
+def persistent_cache_statistics() -> Optional[PersistentCacheStatistics]:
+    """
+    Gets the hit/miss/eviction counters of the persistent cache.
+
+    :return:
+                The statistics, or None if persistent caching is not enabled.
+    """
+    global PERSISTENT_CACHE
+    return PERSISTENT_CACHE.statistics if PERSISTENT_CACHE is not None else None
+
+
+def single_flight_statistics() -> Dict[str, SingleFlightStatistics]:
+    """
+    Gets the counters of calls made to the server, and calls saved by
+    coalescing identical concurrent requests.
+
+    :return:
+                The statistics for the "list" and "download" functions.
+    """
+    global LIST_FLIGHTS, DOWNLOAD_FLIGHTS
+    return {
+        "list": LIST_FLIGHTS.statistics,
+        "download": DOWNLOAD_FLIGHTS.statistics
+    }
+
+
+def list_function(table_name: str, filter: FilterSpec) -> Sequence[RawJSONObject]:
+    global LIST_CACHE
+
+    cache = LIST_CACHE
+
+    if cache is None:
+        return list_function_uncached(table_name, filter)
+
+    result = cache.get(table_name, filter)
+
+    if result is None:
+        result = cache.put(table_name, filter, list_function_uncached(table_name, filter))
+
+    return result
+
+
+def list_function_uncached(table_name: str, filter: FilterSpec) -> List[RawJSONObject]:
+    """
+    Lists a table (bypassing the in-memory cache), sharing the result with
+    any identical requests made while it is in progress.
+    """
+    global LIST_FLIGHTS
+    return LIST_FLIGHTS.call(ListCache.key(table_name, filter), list_from_persistent_cache_or_server, table_name, filter)
+
+
+def list_from_persistent_cache_or_server(table_name: str, filter: FilterSpec) -> List[RawJSONObject]:
+    """
+    Lists a table from the persistent cache if enabled and fresh, otherwise
+    from the server (persistently caching the result).
+    """
+    global LIST_FUNCTION, PERSISTENT_CACHE
+
+    persistent_cache = PERSISTENT_CACHE
+
+    if persistent_cache is None:
+        return LIST_FUNCTION(table_name, filter)
+
+    result = persistent_cache.get_list(table_name, filter)
+
+    if result is None:
+        result = LIST_FUNCTION(table_name, filter)
+        persistent_cache.put_list(table_name, filter, result)
+
+    return result
+
+
+def list_function_from_server(table_name: str, filter: FilterSpec) -> List[RawJSONObject]:
+    """
+    Lists a table from the server, bypassing both the in-memory and persistent
+    caches, for callers (e.g. table snapshots) which keep their own copy of the
+    results and so must see the server's current rows. The result is only
+    shared with identical requests which also bypass the caches. When offline,
+    the table is listed from the persistent cache instead, as the server is
+    never contacted.
+    """
+    global LIST_FLIGHTS, LIST_FUNCTION
+
+    if is_offline():
+        return LIST_FLIGHTS.call(ListCache.key(table_name, filter), list_from_persistent_cache_or_server, table_name, filter)
+
+    return LIST_FLIGHTS.call((SERVER_FLIGHT, *ListCache.key(table_name, filter)), LIST_FUNCTION, table_name, filter)
+
+
+def download_function(table_name: str, pk: int) -> Union[bytes, Iterator[bytes], SizedDownload]:
+    global DOWNLOAD_FLIGHTS
+    return DOWNLOAD_FLIGHTS.call((table_name, pk), download_from_persistent_cache_or_server, table_name, pk)
+
+
+def download_from_persistent_cache_or_server(table_name: str, pk: int) -> Union[bytes, Iterator[bytes], SizedDownload]:
+    """
+    Gets downloaded data from the persistent cache if enabled, otherwise
+    from the server (persistently caching the data).
+    """
+    global DOWNLOAD_FUNCTION, PERSISTENT_CACHE
+
+    persistent_cache = PERSISTENT_CACHE
+
+    if persistent_cache is None:
+        return DOWNLOAD_FUNCTION(table_name, pk)
+
+    result = persistent_cache.get_download(table_name, pk)
+
+    if result is None:
+        result = DOWNLOAD_FUNCTION(table_name, pk)
+        result = persistent_cache.put_download(
+            table_name,
+            pk,
+            result.chunks if isinstance(result, SizedDownload) else result
+        )
+
+    return result
+
+
+def request_semaphore() -> asyncio.Semaphore:
+    """
+    Gets the semaphore which limits the number of concurrent requests to
+    the server from the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = REQUEST_SEMAPHORES.get(loop, None)
+    if semaphore is None:
+        semaphore = REQUEST_SEMAPHORES[loop] = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return semaphore
+
+
+async def list_function_async(table_name: str, filter: FilterSpec) -> Sequence[RawJSONObject]:
+    global ASYNC_LIST_FUNCTION, LIST_CACHE, PERSISTENT_CACHE
+
+    cache = LIST_CACHE
+
+    if cache is not None:
+        result = cache.get(table_name, filter)
+        if result is not None:
+            return result
+
+    if ASYNC_LIST_FUNCTION is None:
+        async with request_semaphore():
+            result = await asyncio.get_running_loop().run_in_executor(None, list_function_uncached, table_name, filter)
+    else:
+        persistent_cache = PERSISTENT_CACHE
+
+        result = persistent_cache.get_list(table_name, filter) if persistent_cache is not None else None
+
+        if result is None:
+            async with request_semaphore():
+                result = await ASYNC_LIST_FUNCTION(table_name, filter)
+
+            if persistent_cache is not None:
+                persistent_cache.put_list(table_name, filter, result)
+
+    if cache is not None:
+        result = cache.put(table_name, filter, result)
+
+    return result
+
+
+async def download_function_async(
+        table_name: str,
+        pk: int
+) -> Union[bytes, bytearray, Iterator[bytes], AsyncIterator[bytes], SizedDownload]:
+    global ASYNC_DOWNLOAD_FUNCTION, PERSISTENT_CACHE
+
+    if ASYNC_DOWNLOAD_FUNCTION is None:
+        # Streamed data is also read in the executor, so the event loop never waits on the download
+        async with request_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(None, download_all, table_name, pk)
+
+    persistent_cache = PERSISTENT_CACHE
+
+    if persistent_cache is None:
+        async with request_semaphore():
+            return await ASYNC_DOWNLOAD_FUNCTION(table_name, pk)
+
+    result = await persistent_cache.get_download_async(table_name, pk)
+
+    if result is None:
+        async with request_semaphore():
+            result = await ASYNC_DOWNLOAD_FUNCTION(table_name, pk)
+
+            # Streamed data is written to the cache as it arrives
+            result = await persistent_cache.put_download_async(
+                table_name,
+                pk,
+                result.chunks if isinstance(result, SizedDownload) else result
+            )
+
+    return result
+
+
+def download_all(table_name: str, pk: int) -> Union[bytes, bytearray]:
+    """
+    Downloads the data for a value, reading streamed data in full.
+    """
+    from ..util import read_all
 
+    result = download_function(table_name, pk)
 
-def download_function(table_name: str, pk: int) -> Union[bytes, Iterator[bytes]]:
-    global DOWNLOAD_FUNCTION
-    return DOWNLOAD_FUNCTION(table_name, pk)
+    if isinstance(result, (bytes, bytearray)):
+        return result
+    elif isinstance(result, SizedDownload):
+        return read_all(*result)
+    else:
+        return read_all(result)
@@ -0,0 +1,185 @@
+import importlib
+import json
+from typing import Callable, Optional, Tuple, Union
+
+from wai.json.raw import RawJSONElement
+
+# Types
+JSONLoadsFunction = Callable[[Union[bytes, bytearray]], RawJSONElement]
+JSONDumpsFunction = Callable[[RawJSONElement], bytes]
+
+# The supported JSON libraries, fastest first
+JSON_BACKENDS = "orjson", "ujson", "json"
+
+# Other libraries only decode integers within 64 bits exactly (larger integers may
+# silently become floats), so documents containing integer parts of 19 or more digits
+# are left to the standard library. Digits are translated to 0, and all characters
+# other than the decimal point to a space, so that a long integer part can be found
+# with a single substring search.
+DIGITS_TRANSLATION = bytes(
+    ord("0") if chr(char).isdigit() else char if char == ord(".") else ord(" ")
+    for char in range(256)
+)
+LONG_DIGIT_RUN = b"0" * 19
+LONG_INTEGER_PART = b" " + LONG_DIGIT_RUN
+
+# The encoding of null, which orjson also writes for non-finite floats
+NULL = b"null"
+
+
+def has_long_integer_part(value: Union[bytes, bytearray]) -> bool:
+    """
+    Whether a binary JSON document contains any number with an integer part
+    of 19 or more digits.
+
+    :param value:
+                The UTF-8 encoded JSON.
+    """
+    translated = value.translate(DIGITS_TRANSLATION)
+    return translated.startswith(LONG_DIGIT_RUN) or LONG_INTEGER_PART in translated
+
+
+def stdlib_loads(value: Union[bytes, bytearray]) -> RawJSONElement:
+    return json.loads(value)
+
+
+def stdlib_dumps(value: RawJSONElement) -> bytes:
+    return json.dumps(value).encode("UTF-8")
+
+
+def load_backend(name: str, encode: bool = False) -> Tuple[JSONLoadsFunction, JSONDumpsFunction]:
+    """
+    Creates the encode/decode functions for the named JSON library. Values which
+    the library can't decode exactly (e.g. integers beyond 64 bits) fall back to
+    the standard library, so all backends decode to the same values.
+
+    Only the standard library writes the default formatting of json.dumps, so
+    other libraries are only used to encode if asked. Their (compact) output
+    decodes to the same values, except that non-finite floats are always encoded
+    by the standard library, as orjson would write them as null.
+
+    :param name:
+                The name of the JSON library.
+    :param encode:
+                Whether to also encode with the library.
+    :return:
+                The decode and encode functions.
+    """
+    if name == "json":
+        return stdlib_loads, stdlib_dumps
+
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'; expected one of {', '.join(JSON_BACKENDS)}")
+
+    library = importlib.import_module(name)
+
+    def loads(value: Union[bytes, bytearray]) -> RawJSONElement:
+        if has_long_integer_part(value):
+            return stdlib_loads(value)
+        try:
+            return library.loads(value)
+        except ValueError:
+            return stdlib_loads(value)
+
+    if not encode:
+        return loads, stdlib_dumps
+
+    if name == "orjson":
+        def library_dumps(value: RawJSONElement) -> bytes:
+            encoded = library.dumps(value)
+            # NaN and infinities are written as null, which can't be told apart from
+            # actual nulls without inspecting the value, so any null is re-encoded
+            if NULL in encoded:
+                raise ValueError("Possible non-finite float")
+            return encoded
+    else:
+        def library_dumps(value: RawJSONElement) -> bytes:
+            return library.dumps(value, ensure_ascii=False, escape_forward_slashes=False, allow_nan=False).encode("UTF-8")
+
+    def dumps(value: RawJSONElement) -> bytes:
+        try:
+            return library_dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            return stdlib_dumps(value)
+
+    return loads, dumps
+
+
+# The currently-selected backend
+JSON_BACKEND: Optional[str] = None
+JSON_LOADS: JSONLoadsFunction = stdlib_loads
+JSON_DUMPS: JSONDumpsFunction = stdlib_dumps
+
+
+def initialise_json_backend(name: Optional[str] = "json", encode: bool = False) -> str:
+    """
+    Selects the library used to decode/encode the binary form of JSON values.
+    The standard library is used unless another is selected, and values decode
+    to the same Python values whichever library is used.
+
+    :param name:
+                The name of the library to use (one of JSON_BACKENDS), or
+                None to use the fastest one which is installed.
+    :param encode:
+                Whether to also encode with the library, rather than only
+                decode. Encoded values are then compact rather than
+                byte-identical to those of the standard library.
+    :return:
+                The name of the selected library.
+    """
+    global JSON_BACKEND, JSON_LOADS, JSON_DUMPS
+
+    if name is None:
+        for name in JSON_BACKENDS:
+            try:
+                loads, dumps = load_backend(name, encode)
+                break
+            except ImportError:
+                pass
+    else:
+        loads, dumps = load_backend(name, encode)
+
+    JSON_BACKEND, JSON_LOADS, JSON_DUMPS = name, loads, dumps
+
+    return name
+
+
+def json_backend() -> str:
+    """
+    Gets the name of the library used to decode/encode binary JSON values,
+    selecting the standard library if none has been selected yet.
+    """
+    global JSON_BACKEND
+    if JSON_BACKEND is None:
+        initialise_json_backend()
+    return JSON_BACKEND
+
+
+def json_loads(value: Union[bytes, bytearray]) -> RawJSONElement:
+    """
+    Decodes binary JSON using the selected backend.
+
+    :param value:
+                The UTF-8 encoded JSON.
+    :return:
+                The raw JSON value.
+    """
+    global JSON_BACKEND, JSON_LOADS
+    if JSON_BACKEND is None:
+        initialise_json_backend()
+    return JSON_LOADS(value)
+
+
+def json_dumps(value: RawJSONElement) -> bytes:
+    """
+    Encodes a raw JSON value to binary using the selected backend.
+
+    :param value:
+                The raw JSON value.
+    :return:
+                The UTF-8 encoded JSON.
+    """
+    global JSON_BACKEND, JSON_DUMPS
+    if JSON_BACKEND is None:
+        initialise_json_backend()
+    return JSON_DUMPS(value)
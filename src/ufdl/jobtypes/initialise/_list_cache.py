@@ -0,0 +1,159 @@
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from ufdl.json.core.filter import FilterSpec
+
+from wai.json.raw import RawJSONObject
+
+
+class ListCacheStatistics(NamedTuple):
+    """
+    Counters describing the effectiveness of a list cache.
+    """
+    # The number of list requests served from the cache
+    hits: int
+
+    # The number of list requests which had to go to the server
+    misses: int
+
+    # The number of entries discarded to keep the cache within its size bound
+    evictions: int
+
+    # The number of entries currently in the cache
+    size: int
+
+
+class ListCache:
+    """
+    Cache of the results of listing server tables, keyed on the table name and
+    the filter used. Entries expire after a per-table time-to-live, and the least
+    recently used entries are discarded once the cache is full. Results are held
+    as tuples, as the same result is returned to every caller.
+    """
+    def __init__(
+            self,
+            default_ttl: float,
+            table_ttls: Optional[Dict[str, float]] = None,
+            max_size: int = 1024
+    ):
+        if max_size < 1:
+            raise ValueError(f"Cache size must be positive; got {max_size}")
+
+        self._default_ttl: float = default_ttl
+        self._table_ttls: Dict[str, float] = dict(table_ttls) if table_ttls is not None else {}
+        self._max_size: int = max_size
+
+        # Cached results, keyed on table name and formatted filter, with their expiry times
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, Tuple[RawJSONObject, ...]]] = OrderedDict()
+        self._lock = Lock()
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    def ttl(self, table_name: str) -> float:
+        """
+        Gets the time-to-live of cached results for a table.
+
+        :param table_name:
+                    The table.
+        :return:
+                    The time-to-live in seconds.
+        """
+        return self._table_ttls.get(table_name, self._default_ttl)
+
+    @staticmethod
+    def key(table_name: str, filter: FilterSpec) -> Tuple[str, str]:
+        """
+        Gets the key to cache the results of a list request under.
+
+        :param table_name:
+                    The table being listed.
+        :param filter:
+                    The filter applied to the table.
+        :return:
+                    The cache key.
+        """
+        return table_name, json.dumps(filter.to_raw_json(), sort_keys=True)
+
+    def get(self, table_name: str, filter: FilterSpec) -> Optional[Tuple[RawJSONObject, ...]]:
+        """
+        Gets the cached result of a list request, if it hasn't expired.
+
+        :param table_name:
+                    The table being listed.
+        :param filter:
+                    The filter applied to the table.
+        :return:
+                    The cached result, or None if not cached.
+        """
+        key = ListCache.key(table_name, filter)
+        with self._lock:
+            entry = self._entries.get(key, None)
+
+            if entry is not None:
+                expiry, result = entry
+                if time.monotonic() < expiry:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return result
+                del self._entries[key]
+
+            self._misses += 1
+            return None
+
+    def put(self, table_name: str, filter: FilterSpec, result: Sequence[RawJSONObject]) -> Tuple[RawJSONObject, ...]:
+        """
+        Caches the result of a list request.
+
+        :param table_name:
+                    The table that was listed.
+        :param filter:
+                    The filter applied to the table.
+        :param result:
+                    The result of the list request.
+        :return:
+                    The result, as it will be returned from the cache.
+        """
+        result = tuple(result)
+
+        ttl = self.ttl(table_name)
+
+        if ttl <= 0:
+            return result
+
+        key = ListCache.key(table_name, filter)
+        with self._lock:
+            self._entries[key] = time.monotonic() + ttl, result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return result
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Discards cached results.
+
+        :param table_name:
+                    The table to discard the results for, or None to
+                    discard all results.
+        """
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == table_name]:
+                    del self._entries[key]
+
+    @property
+    def statistics(self) -> ListCacheStatistics:
+        """
+        The hit/miss counters of the cache.
+        """
+        with self._lock:
+            return ListCacheStatistics(self._hits, self._misses, self._evictions, len(self._entries))
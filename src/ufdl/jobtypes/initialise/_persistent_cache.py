@@ -0,0 +1,498 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from threading import Lock
+from typing import IO, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote
+
+from ufdl.json.core.filter import FilterSpec
+
+from wai.json.raw import RawJSONObject
+
+from ..error import OfflineCacheMissException
+from ._json_backend import json_dumps, json_loads
+from ._list_cache import ListCache
+from ._sized_download import SizedDownload
+
+# The number of bytes read from a cached download at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The name of the database file within the cache directory
+DATABASE_FILENAME = "cache.sqlite"
+
+# The name of the directory holding downloaded data within the cache directory
+DOWNLOADS_DIRECTORY = "downloads"
+
+
+class PersistentCacheStatistics(NamedTuple):
+    """
+    Counters describing the effectiveness of a persistent cache.
+    """
+    # The number of requests served from the cache
+    hits: int
+
+    # The number of requests which had to go to the server
+    misses: int
+
+    # The number of downloads discarded to keep the cache within its size bound
+    evictions: int
+
+
+class PersistentCache:
+    """
+    On-disk cache of the results of listing server tables, and of downloaded data,
+    which survives restarts of the process. List results are kept in an SQLite
+    database, and are fresh for a per-table maximum age; downloads are kept in
+    files by table and primary-key, and never go stale, but the least recently
+    used are discarded once their total size exceeds a bound. In offline mode,
+    cached results are used regardless of their age, and anything not in the
+    cache is an error rather than a request to the server.
+    """
+    def __init__(
+            self,
+            directory: str,
+            default_max_age: Optional[float] = 3600.0,
+            table_max_ages: Optional[Dict[str, Optional[float]]] = None,
+            offline: bool = False,
+            max_download_size: Optional[int] = None
+    ):
+        if max_download_size is not None and max_download_size < 1:
+            raise ValueError(f"Maximum download size must be positive; got {max_download_size}")
+
+        self._directory: str = directory
+        self._default_max_age: Optional[float] = default_max_age
+        self._table_max_ages: Dict[str, Optional[float]] = dict(table_max_ages) if table_max_ages is not None else {}
+        self._offline: bool = offline
+        self._max_download_size: Optional[int] = max_download_size
+
+        os.makedirs(os.path.join(directory, DOWNLOADS_DIRECTORY), exist_ok=True)
+
+        self._connection = sqlite3.connect(os.path.join(directory, DATABASE_FILENAME), check_same_thread=False)
+        self._lock = Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lists ("
+                "table_name TEXT NOT NULL, filter TEXT NOT NULL, stored_at REAL NOT NULL, result BLOB NOT NULL, "
+                "PRIMARY KEY (table_name, filter))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS downloads ("
+                "table_name TEXT NOT NULL, pk INTEGER NOT NULL, stored_at REAL NOT NULL, size INTEGER NOT NULL, "
+                "PRIMARY KEY (table_name, pk))"
+            )
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+        # The bound may be lower than when the downloads were cached
+        with self._lock, self._connection:
+            self.evict_downloads()
+
+    @property
+    def offline(self) -> bool:
+        """
+        Whether the cache is the only source of server data.
+        """
+        return self._offline
+
+    def max_age(self, table_name: str) -> Optional[float]:
+        """
+        Gets the age after which cached results for a table are stale.
+
+        :param table_name:
+                    The table.
+        :return:
+                    The maximum age in seconds, or None if results never go stale.
+        """
+        return self._table_max_ages.get(table_name, self._default_max_age)
+
+    def is_fresh(self, table_name: str, stored_at: float) -> bool:
+        """
+        Whether a result cached at the given time can still be used.
+
+        :param table_name:
+                    The table the result is from.
+        :param stored_at:
+                    The (wall-clock) time the result was cached.
+        """
+        if self._offline:
+            return True
+
+        max_age = self.max_age(table_name)
+
+        return max_age is None or time.time() - stored_at < max_age
+
+    def get_list(self, table_name: str, filter: FilterSpec) -> Optional[List[RawJSONObject]]:
+        """
+        Gets the cached result of a list request, if it is still fresh.
+
+        :param table_name:
+                    The table being listed.
+        :param filter:
+                    The filter applied to the table.
+        :return:
+                    The cached result, or None if not cached and online.
+        """
+        _, filter_key = ListCache.key(table_name, filter)
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT stored_at, result FROM lists WHERE table_name = ? AND filter = ?",
+                (table_name, filter_key)
+            ).fetchone()
+
+            if row is not None and self.is_fresh(table_name, row[0]):
+                self._hits += 1
+                return json_loads(row[1])
+
+            self._misses += 1
+
+        if self._offline:
+            raise OfflineCacheMissException(table_name, f"list with filter {filter_key}")
+
+        return None
+
+    def put_list(self, table_name: str, filter: FilterSpec, result: List[RawJSONObject]):
+        """
+        Caches the result of a list request.
+
+        :param table_name:
+                    The table that was listed.
+        :param filter:
+                    The filter applied to the table.
+        :param result:
+                    The result of the list request.
+        """
+        if self.max_age(table_name) == 0:
+            return
+
+        _, filter_key = ListCache.key(table_name, filter)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO lists (table_name, filter, stored_at, result) VALUES (?, ?, ?, ?)",
+                (table_name, filter_key, time.time(), json_dumps(result))
+            )
+
+    def download_path(self, table_name: str, pk: int) -> str:
+        """
+        Gets the path of the file holding the downloaded data for a value.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :return:
+                    The file path.
+        """
+        return os.path.join(self._directory, DOWNLOADS_DIRECTORY, quote(table_name, safe=""), str(pk))
+
+    def get_download(self, table_name: str, pk: int) -> Optional[SizedDownload]:
+        """
+        Gets the cached data for a value.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :return:
+                    The cached data, or None if not cached and online.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size FROM downloads WHERE table_name = ? AND pk = ?",
+                (table_name, pk)
+            ).fetchone()
+
+            path = self.download_path(table_name, pk)
+
+            if row is not None and os.path.exists(path):
+                self._hits += 1
+
+                # Downloads are evicted least-recently used first
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE downloads SET stored_at = ? WHERE table_name = ? AND pk = ?",
+                        (time.time(), table_name, pk)
+                    )
+
+                return SizedDownload(iter_file(path), row[0])
+
+            self._misses += 1
+
+        if self._offline:
+            raise OfflineCacheMissException(table_name, f"download of PK {pk}")
+
+        return None
+
+    def put_download(
+            self,
+            table_name: str,
+            pk: int,
+            data: Union[bytes, bytearray, Iterator[bytes]]
+    ) -> Union[bytes, bytearray, SizedDownload]:
+        """
+        Caches the downloaded data for a value. Streamed data is written to the
+        cache as it arrives, and then read back from the cache.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :param data:
+                    The downloaded data, or its chunks.
+        :return:
+                    The data, to be used in place of the downloaded data.
+        """
+        path = self.download_path(table_name, pk)
+
+        # Written to a temporary file first, so that partially-written data is never read
+        file, temporary_path = self.open_temporary_download(path)
+        try:
+            with file:
+                if isinstance(data, (bytes, bytearray)):
+                    file.write(data)
+                else:
+                    for chunk in data:
+                        file.write(chunk)
+                size = file.tell()
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        if isinstance(data, (bytes, bytearray)):
+            self.record_download(table_name, pk, size)
+            return data
+
+        # Opened before being recorded, so it can be read even if another download evicts it
+        chunks = iter_file(path)
+        self.record_download(table_name, pk, size)
+        return SizedDownload(chunks, size)
+
+    async def get_download_async(self, table_name: str, pk: int) -> Optional[SizedDownload]:
+        """
+        Gets the cached data for a value, as get_download does, without
+        blocking the event loop.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :return:
+                    The cached data, or None if not cached and online.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_download, table_name, pk)
+
+    async def put_download_async(
+            self,
+            table_name: str,
+            pk: int,
+            data: Union[bytes, bytearray, Iterator[bytes], AsyncIterator[bytes]]
+    ) -> Union[bytes, bytearray, SizedDownload]:
+        """
+        Caches the downloaded data for a value, as put_download does, without
+        blocking the event loop. Asynchronously-streamed data is written to
+        the cache as it arrives.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :param data:
+                    The downloaded data, or its (possibly asynchronous) chunks.
+        :return:
+                    The data, to be used in place of the downloaded data.
+        """
+        loop = asyncio.get_running_loop()
+
+        if not hasattr(data, "__aiter__"):
+            return await loop.run_in_executor(None, self.put_download, table_name, pk, data)
+
+        path = self.download_path(table_name, pk)
+
+        file, temporary_path = await loop.run_in_executor(None, self.open_temporary_download, path)
+        try:
+            try:
+                async for chunk in data:
+                    await loop.run_in_executor(None, file.write, chunk)
+                size = file.tell()
+            finally:
+                await loop.run_in_executor(None, file.close)
+            await loop.run_in_executor(None, os.replace, temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        chunks = await loop.run_in_executor(None, iter_file, path)
+        await loop.run_in_executor(None, self.record_download, table_name, pk, size)
+
+        return SizedDownload(chunks, size)
+
+    def open_temporary_download(self, path: str) -> Tuple[IO[bytes], str]:
+        """
+        Opens a temporary file to write downloaded data to, beside the path
+        the data is to be cached at.
+
+        :param path:
+                    The path the data is to be cached at.
+        :return:
+                    The temporary file, opened for writing, and its path.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        return os.fdopen(file_descriptor, "wb"), temporary_path
+
+    def record_download(self, table_name: str, pk: int, size: int):
+        """
+        Records that the data for a value has been written to the cache,
+        evicting other downloads if the cache is now over its size bound.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        :param size:
+                    The number of bytes of data.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO downloads (table_name, pk, stored_at, size) VALUES (?, ?, ?, ?)",
+                (table_name, pk, time.time(), size)
+            )
+            self.evict_downloads((table_name, pk))
+
+    def evict_downloads(self, keep: Optional[Tuple[str, int]] = None):
+        """
+        Discards the least recently used downloads until the total size of
+        the downloads is within the cache's bound. Must be called with the
+        lock held, inside a transaction.
+
+        :param keep:
+                    The table and primary-key of a download which is not to
+                    be discarded (e.g. because it has just been cached), if any.
+        """
+        if self._max_download_size is None:
+            return
+
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM downloads").fetchone()[0]
+
+        if total_size <= self._max_download_size:
+            return
+
+        rows = self._connection.execute(
+            "SELECT table_name, pk, size FROM downloads ORDER BY stored_at"
+        ).fetchall()
+
+        for table_name, pk, size in rows:
+            if total_size <= self._max_download_size:
+                break
+
+            if (table_name, pk) == keep:
+                continue
+
+            self.remove_download(table_name, pk)
+            total_size -= size
+            self._evictions += 1
+
+    def remove_download(self, table_name: str, pk: int):
+        """
+        Deletes the cached data for a value. Must be called with the lock
+        held, inside a transaction.
+
+        :param table_name:
+                    The table of the value.
+        :param pk:
+                    The primary-key of the value.
+        """
+        self._connection.execute("DELETE FROM downloads WHERE table_name = ? AND pk = ?", (table_name, pk))
+
+        # The file may already be gone, or (on Windows) still be open for reading
+        try:
+            os.remove(self.download_path(table_name, pk))
+        except OSError:
+            pass
+
+    def purge_downloads(self, table_name: Optional[str] = None):
+        """
+        Discards cached downloads.
+
+        :param table_name:
+                    The table to discard the downloads for, or None to
+                    discard all downloads.
+        """
+        with self._lock, self._connection:
+            if table_name is None:
+                rows = self._connection.execute("SELECT table_name, pk FROM downloads").fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT table_name, pk FROM downloads WHERE table_name = ?",
+                    (table_name,)
+                ).fetchall()
+
+            for row_table_name, pk in rows:
+                self.remove_download(row_table_name, pk)
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Discards cached list results. Downloaded data is kept, as it
+        never goes stale (see purge_downloads).
+
+        :param table_name:
+                    The table to discard the results for, or None to
+                    discard all results.
+        """
+        with self._lock, self._connection:
+            if table_name is None:
+                self._connection.execute("DELETE FROM lists")
+            else:
+                self._connection.execute("DELETE FROM lists WHERE table_name = ?", (table_name,))
+
+    @property
+    def statistics(self) -> PersistentCacheStatistics:
+        """
+        The hit/miss/eviction counters of the cache.
+        """
+        with self._lock:
+            return PersistentCacheStatistics(self._hits, self._misses, self._evictions)
+
+    def close(self):
+        """
+        Closes the cache's database.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def iter_file(path: str) -> Iterator[bytes]:
+    """
+    Reads a file in chunks. The file is opened immediately, so it can still
+    be read if it is evicted from the cache before the first chunk is read.
+
+    :param path:
+                The path to the file.
+    :return:
+                An iterator over the chunks of the file.
+    """
+    return iter_open_file(open(path, "rb"))
+
+
+def iter_open_file(file: IO[bytes]) -> Iterator[bytes]:
+    """
+    Reads an open file in chunks, closing it once read.
+
+    :param file:
+                The file.
+    :return:
+                An iterator over the chunks of the file.
+    """
+    with file:
+        while True:
+            chunk = file.read(DOWNLOAD_CHUNK_SIZE)
+            if len(chunk) == 0:
+                break
+            yield chunk
@@ -0,0 +1,103 @@
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class SingleFlightStatistics(NamedTuple):
+    """
+    Counters describing the effectiveness of request coalescing.
+    """
+    # The number of calls made to the underlying function
+    calls: int
+
+    # The number of requests which shared the result of another in-flight call,
+    # i.e. the number of calls saved
+    coalesced: int
+
+
+class Flight:
+    """
+    A call to the underlying function which is in progress.
+    """
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Merges identical concurrent calls, so that while a call for a key is in progress,
+    further requests for the same key wait for and share its result instead of making
+    their own calls.
+    """
+    def __init__(self, shareable: Optional[Callable[[Any], bool]] = None):
+        """
+        :param shareable:
+                    Whether a result can be shared between requests (e.g. an iterator
+                    can only be consumed once). Requests which can't share the result
+                    make their own calls. If None, all results are shared.
+        """
+        self._shareable: Optional[Callable[[Any], bool]] = shareable
+
+        # The calls currently in progress
+        self._flights: Dict[Hashable, Flight] = {}
+        self._lock = Lock()
+
+        self._calls: int = 0
+        self._coalesced: int = 0
+
+    def call(self, key: Hashable, function: Callable, *args) -> Any:
+        """
+        Calls the function, unless a call with the same key is already
+        in progress, in which case its result is shared.
+
+        :param key:
+                    The key identifying identical calls.
+        :param function:
+                    The function to call.
+        :param args:
+                    The arguments to the function.
+        :return:
+                    The result of the function.
+        """
+        with self._lock:
+            flight = self._flights.get(key, None)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = Flight()
+                self._calls += 1
+
+        if is_leader:
+            try:
+                flight.result = function(*args)
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+
+        flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+
+        if self._shareable is not None and not self._shareable(flight.result):
+            with self._lock:
+                self._calls += 1
+            return function(*args)
+
+        with self._lock:
+            self._coalesced += 1
+
+        return flight.result
+
+    @property
+    def statistics(self) -> SingleFlightStatistics:
+        """
+        The call/coalesced counters.
+        """
+        with self._lock:
+            return SingleFlightStatistics(self._calls, self._coalesced)
@@ -0,0 +1,13 @@
+from typing import Iterator, NamedTuple
+
+
+class SizedDownload(NamedTuple):
+    """
+    Downloaded data which arrives in chunks, but whose total size is known
+    in advance (e.g. from a Content-Length header).
+    """
+    # The chunks of data
+    chunks: Iterator[bytes]
+
+    # The total number of bytes in all chunks
+    size: int
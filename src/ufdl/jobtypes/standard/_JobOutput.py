@@ -1,14 +1,16 @@
-from typing import List, Tuple
+import asyncio
+from io import BytesIO
+from typing import IO, Iterator, List, Sequence, Tuple, Union
 
 from ufdl.json.core.filter import FilterExpression
 from ufdl.json.core.filter.field import Exact
-from wai.json.raw import RawJSONElement
+from wai.json.raw import RawJSONElement, RawJSONObject
 from wai.json.schema import JSONSchema, enum
 
-from ..base import InputType, OutputType, UFDLType, ServerResidentType
+from ..base import BINARY_VALUE_TYPES, InputType, OutputType, UFDLType, ServerResidentType
 from ..error import expect
-from ..initialise import download_function
-from ..util import read_all
+from ..initialise import download_function, download_function_async, SizedDownload
+from ..util import iter_stream, read_all, read_all_async, spool, spool_async
 
 
 class JobOutput(
@@ -29,20 +31,130 @@ class JobOutput(
     def parse_json_value(self, value: RawJSONElement) -> InputType:
         self.validate_with_schema(value)
         downloaded_job_output_data = download_function(self.server_table_name(), value)
-        if not isinstance(downloaded_job_output_data, bytes):
+        if isinstance(downloaded_job_output_data, SizedDownload):
+            downloaded_job_output_data = read_all(*downloaded_job_output_data)
+        elif not isinstance(downloaded_job_output_data, BINARY_VALUE_TYPES):
             downloaded_job_output_data = read_all(downloaded_job_output_data)
         return self.type_args[0].parse_binary_value(downloaded_job_output_data)
 
+    async def parse_json_value_async(self, value: RawJSONElement) -> InputType:
+        return (await self.parse_json_values_async((value,)))[0]
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        # Validate all references against a single listing of the job-outputs
+        index = await self.membership_index_async()
+        for value in values:
+            self.validate_membership(value, index)
+
+        # Download the job-outputs concurrently
+        return tuple(
+            await asyncio.gather(
+                *(
+                    self.download_and_parse_async(value)
+                    for value in values
+                )
+            )
+        )
+
+    async def download_and_parse_async(self, pk: int) -> InputType:
+        """
+        Downloads a job-output and parses it, without blocking the event loop.
+
+        :param pk:
+                    The primary-key of the job-output.
+        :return:
+                    The job-output's value.
+        """
+        downloaded_job_output_data = await download_function_async(self.server_table_name(), pk)
+        if isinstance(downloaded_job_output_data, SizedDownload):
+            downloaded_job_output_data = await read_all_async(*downloaded_job_output_data)
+        elif not isinstance(downloaded_job_output_data, BINARY_VALUE_TYPES):
+            downloaded_job_output_data = await read_all_async(downloaded_job_output_data)
+        return await self.type_args[0].parse_binary_value_async(downloaded_job_output_data)
+
+    def parse_json_value_streaming(self, value: RawJSONElement) -> InputType:
+        """
+        Parses a job-output reference, passing the downloaded data to the output's
+        type as a stream instead of as bytes. Types which can consume streams receive
+        the data without it ever being collected in memory; streamed downloads are
+        read as they arrive by types which only read forwards, and are spooled to a
+        temporary file as they arrive for types which need to seek.
+
+        :param value:
+                    The primary-key of the job-output.
+        :return:
+                    The job-output's value.
+        """
+        self.validate_with_schema(value)
+        downloaded_job_output_data = download_function(self.server_table_name(), value)
+        return self.type_args[0].parse_binary_stream(self.download_stream(downloaded_job_output_data))
+
+    async def parse_json_value_streaming_async(self, value: RawJSONElement) -> InputType:
+        """
+        Parses a job-output reference as parse_json_value_streaming does, without
+        blocking the event loop. Asynchronously-streamed downloads are spooled
+        to a temporary file as they arrive, and the output's type parses the
+        stream in an executor.
+
+        :param value:
+                    The primary-key of the job-output.
+        :return:
+                    The job-output's value.
+        """
+        self.validate_membership(value, await self.membership_index_async())
+        downloaded_job_output_data = await download_function_async(self.server_table_name(), value)
+        if isinstance(downloaded_job_output_data, SizedDownload):
+            downloaded_job_output_data = downloaded_job_output_data.chunks
+        if hasattr(downloaded_job_output_data, "__aiter__"):
+            downloaded_job_output_data = await spool_async(downloaded_job_output_data)
+
+        # Reading the stream may block on the download, so the stream is also created in the executor
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self.type_args[0].parse_binary_stream(self.download_stream(downloaded_job_output_data))
+        )
+
+    def download_stream(self, downloaded: Union[bytes, bytearray, Iterator[bytes], SizedDownload, IO[bytes]]) -> IO[bytes]:
+        """
+        Gets a stream over the downloaded data of a job-output, suited to
+        how the output's type reads streams.
+
+        :param downloaded:
+                    The downloaded data, its chunks, or a stream over it.
+        :return:
+                    The stream.
+        """
+        if isinstance(downloaded, BINARY_VALUE_TYPES):
+            return BytesIO(downloaded)
+
+        if hasattr(downloaded, "read"):
+            return downloaded
+
+        if isinstance(downloaded, SizedDownload):
+            downloaded = downloaded.chunks
+
+        # Only types which seek need the data spooled; others read it as it arrives
+        if self.type_args[0].requires_seekable_stream:
+            return spool(downloaded)
+
+        return iter_stream(downloaded)
+
     def format_python_value_to_json(self, value: int) -> RawJSONElement:
         expect(int, value)
         return value
 
+    def json_value_from_listing(self, listed: RawJSONObject) -> RawJSONElement:
+        return listed['pk']
+
+    def validate_with_schema(self, value: RawJSONElement):
+        self.validate_membership(value)
+
     @property
     def json_schema(self) -> JSONSchema:
         return enum(
             *(
-                value['pk']
-                for value in self.list_all_json_values()
+                self.json_value_from_listing(value)
+                for value in self.server_listing()
             )
         )
 
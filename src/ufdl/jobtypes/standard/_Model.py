@@ -1,6 +1,7 @@
-from typing import Tuple
+import shutil
+from typing import IO, Tuple, Union
 
-from ..base import UFDLType
+from ..base import BinaryValue, BINARY_VALUE_TYPES, UFDLType
 from ..error import expect
 from .server import Domain, Framework
 
@@ -12,13 +13,24 @@ class Model(
         bytes
     ]
 ):
-    def parse_binary_value(self, value: bytes) -> bytes:
-        expect(bytes, value)
+    def parse_binary_value(self, value: BinaryValue) -> BinaryValue:
+        expect(BINARY_VALUE_TYPES, value)
         return value
 
-    def format_python_value(self, value: bytes) -> bytes:
-        expect(bytes, value)
-        return value
+    def parse_binary_stream(self, stream: IO[bytes]) -> IO[bytes]:
+        # The stream is the value, so it is never read into memory
+        return stream
+
+    def format_python_value(self, value: BinaryValue) -> bytes:
+        expect(BINARY_VALUE_TYPES, value)
+        return value if isinstance(value, bytes) else bytes(value)
+
+    def format_python_value_to_stream(self, value: Union[BinaryValue, IO[bytes]], stream: IO[bytes]):
+        # Values can also be given as readable streams, which are copied a chunk at a time
+        if isinstance(value, BINARY_VALUE_TYPES):
+            stream.write(value)
+        else:
+            shutil.copyfileobj(value, stream)
 
     @classmethod
     def type_params_expected_base_types(cls) -> Tuple[UFDLType, ...]:
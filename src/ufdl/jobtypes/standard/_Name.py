@@ -1,9 +1,9 @@
-from typing import Any, List, Tuple, Union
+from typing import Any, Optional, Sequence, Tuple, Union
 
-from wai.json.raw import RawJSONElement
+from wai.json.raw import RawJSONElement, RawJSONObject
 from wai.json.schema import JSONSchema, enum
 
-from ..base import FiniteJSONType, NamedServerType, UFDLType, InputType, OutputType
+from ..base import FiniteJSONType, NamedServerType, TableSnapshot, UFDLType, InputType, OutputType
 from ..error import expect
 
 
@@ -31,17 +31,43 @@ class Name(
         sub_type = self.type_args[0]
         return sub_type.get_python_value_by_name(value)
 
+    async def parse_json_value_async(self, value: RawJSONElement) -> InputType:
+        return (await self.parse_json_values_async((value,)))[0]
+
+    def parse_json_values(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        for value in values:
+            expect(str, value)
+        sub_type = self.type_args[0]
+        return sub_type.get_python_values_by_names(values)
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        for value in values:
+            expect(str, value)
+        sub_type = self.type_args[0]
+        return await sub_type.get_python_values_by_names_async(values)
+
     def format_python_value_to_json(self, value: str) -> RawJSONElement:
         self.validate_with_schema(value)
         return value
 
-    def list_all_json_values(self) -> List[RawJSONElement]:
-        sub_type = self.type_args[0]
+    def validate_with_schema(self, value: RawJSONElement):
+        self.validate_membership(value)
+
+    def list_all_json_values(self) -> Sequence[RawJSONElement]:
         return list(
-            sub_type.extract_name_from_json(value)
-            for value in sub_type.list_all_json_values()
+            self.json_value_from_listing(value)
+            for value in self.server_listing()
         )
 
+    def server_listing(self) -> Sequence[RawJSONElement]:
+        return self.type_args[0].list_all_json_values()
+
+    def listing_snapshot(self) -> Optional[Tuple[TableSnapshot, Optional[float]]]:
+        return self.type_args[0].listing_snapshot()
+
+    def json_value_from_listing(self, listed: RawJSONObject) -> RawJSONElement:
+        return self.type_args[0].extract_name_from_json(listed)
+
     @property
     def json_schema(self) -> JSONSchema:
         return enum(*self.list_all_json_values())
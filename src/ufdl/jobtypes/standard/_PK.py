@@ -1,11 +1,15 @@
-from typing import Any, List, Tuple, Union
+import asyncio
+import operator
+from functools import reduce
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
 
+from ufdl.json.core.filter import FilterExpression
 from ufdl.json.core.filter.field import Exact
 
-from wai.json.raw import RawJSONElement
+from wai.json.raw import RawJSONElement, RawJSONObject
 from wai.json.schema import JSONSchema, enum
 
-from ..base import InputType, OutputType, ServerResidentType, FiniteJSONType, UFDLType
+from ..base import InputType, OutputType, ServerResidentType, FiniteJSONType, TableSnapshot, UFDLType
 from ..error import expect
 
 
@@ -16,6 +20,9 @@ class PK(
         int
     ]
 ):
+    # The maximum number of primary-keys to request from the server at once
+    BATCH_SIZE: int = 100
+
     def __init__(
             self,
             type_args: Union[
@@ -28,12 +35,21 @@ class PK(
             type_args = type_args,
         super().__init__(type_args)
 
-    def list_all_json_values(self) -> List[RawJSONElement]:
+    def list_all_json_values(self) -> Sequence[RawJSONElement]:
         return [
-            value['pk']
-            for value in self.type_args[0].list_all_json_values()
+            self.json_value_from_listing(value)
+            for value in self.server_listing()
         ]
 
+    def server_listing(self) -> Sequence[RawJSONElement]:
+        return self.type_args[0].list_all_json_values()
+
+    def listing_snapshot(self) -> Optional[Tuple[TableSnapshot, Optional[float]]]:
+        return self.type_args[0].listing_snapshot()
+
+    def json_value_from_listing(self, listed: RawJSONObject) -> RawJSONElement:
+        return listed['pk']
+
     def parse_json_value(self, value: RawJSONElement) -> InputType:
         expect(int, value)
         sub_type = self.type_args[0]
@@ -42,10 +58,107 @@ class PK(
             raise Exception(f"Couldn't get unique value with PK {value} from server")
         return sub_type.parse_json_value(results[0])
 
+    async def parse_json_value_async(self, value: RawJSONElement) -> InputType:
+        expect(int, value)
+        sub_type = self.type_args[0]
+        results = await sub_type.get_filtered_list_of_json_values_async(Exact(field="pk", value=value))
+        if len(results) != 1:
+            raise Exception(f"Couldn't get unique value with PK {value} from server")
+        return sub_type.parse_json_value(results[0])
+
+    def parse_json_values(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        for value in values:
+            expect(int, value)
+        sub_type = self.type_args[0]
+
+        # Request the values for all (unique) primary-keys, a batch at a time
+        pks = list(dict.fromkeys(values))
+        results = [
+            result
+            for pk_filter in self.pk_filters(pks)
+            for result in sub_type.get_filtered_list_of_json_values(pk_filter)
+        ]
+
+        return self.parse_json_values_by_pks(values, pks, results)
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[InputType, ...]:
+        for value in values:
+            expect(int, value)
+        sub_type = self.type_args[0]
+
+        # Request the values for all (unique) primary-keys, all batches at once
+        pks = list(dict.fromkeys(values))
+        results = await asyncio.gather(
+            *(
+                sub_type.get_filtered_list_of_json_values_async(pk_filter)
+                for pk_filter in self.pk_filters(pks)
+            )
+        )
+
+        return self.parse_json_values_by_pks(
+            values,
+            pks,
+            [result for batch_results in results for result in batch_results]
+        )
+
+    @staticmethod
+    def pk_filters(pks: Sequence[int]) -> Iterator[FilterExpression]:
+        """
+        Gets filters which together select the values with the given
+        primary-keys, one for each batch of primary-keys.
+
+        :param pks:
+                    The (unique) primary-keys to filter for.
+        :return:
+                    An iterator over the filters.
+        """
+        for batch_start in range(0, len(pks), PK.BATCH_SIZE):
+            yield reduce(
+                operator.or_,
+                (Exact(field="pk", value=pk) for pk in pks[batch_start:batch_start + PK.BATCH_SIZE])
+            )
+
+    def parse_json_values_by_pks(
+            self,
+            values: Sequence[int],
+            pks: Sequence[int],
+            results: List[RawJSONObject]
+    ) -> Tuple[InputType, ...]:
+        """
+        Parses the values listed from the server for a number of primary-keys.
+
+        :param values:
+                    The primary-keys to parse, in order.
+        :param pks:
+                    The unique primary-keys that were requested.
+        :param results:
+                    The values listed from the server.
+        :return:
+                    The values, in the same order as their primary-keys.
+        """
+        sub_type = self.type_args[0]
+
+        results_by_pk = {
+            result['pk']: result
+            for result in results
+        }
+
+        for pk in pks:
+            if pk not in results_by_pk:
+                raise Exception(f"Couldn't get unique value with PK {pk} from server")
+
+        return tuple(
+            sub_type.parse_json_value(results_by_pk[value])
+            for value in values
+        )
+
     def format_python_value_to_json(self, value: int) -> RawJSONElement:
         self.validate_with_schema(value)
         return value
 
+    def validate_with_schema(self, value: RawJSONElement):
+        self.validate_membership(value)
+
     @property
     def json_schema(self) -> JSONSchema:
         return enum(*self.list_all_json_values())
@@ -0,0 +1,101 @@
+from io import BytesIO
+from typing import IO, Mapping, Optional, Tuple, Union, overload
+from zipfile import ZipFile
+
+from wai.common.meta import instanceoptionalmethod
+
+from ...base import BinaryValue, BINARY_VALUE_TYPES, InputType, OutputType, UFDLType, Integer
+from ...error import expect
+from ..util._codec_type_args import codec_and_level, codec_type_args, format_codec_type_args
+from ..util._codecs import ZIP_CODECS
+from ._ArchiveMapping import ArchiveMapping
+
+
+class Archive(
+    UFDLType[
+        Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer, Integer],
+        ArchiveMapping[InputType],
+        Mapping[str, OutputType]
+    ]
+):
+    """
+    Container of named binary values, each stored as a separate member of a zip
+    archive. Parsing returns a lazy mapping, so only the entries which are
+    accessed are decompressed. The codec (one of the zip format's codecs, by
+    compression method or name) and optional level are given as for Compressed,
+    e.g. Archive<BLOB<'image'>, 0> or Archive<BLOB<'text'>, 'deflate', 9>.
+    """
+    @overload
+    def __init__(
+            self,
+            element_type: UFDLType[Tuple[UFDLType, ...], InputType, OutputType],
+            codec: Optional[Union[str, int]] = None,
+            level: Optional[int] = None
+    ): ...
+    @overload
+    def __init__(self, type_args: Optional[Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer, Integer]] = None): ...
+
+    def __init__(self, *args):
+        super().__init__(codec_type_args(args))
+
+        self._codec, self._level = codec_and_level(self.type_args, tuple(ZIP_CODECS))
+
+    @property
+    def codec(self) -> Optional[str]:
+        """
+        The name of the codec entries are compressed with, or None if not given.
+        """
+        return self._codec
+
+    @property
+    def level(self) -> Optional[int]:
+        """
+        The compression level, or None for the codec's default.
+        """
+        return self._level
+
+    def parse_binary_value(self, value: BinaryValue) -> ArchiveMapping[InputType]:
+        expect(BINARY_VALUE_TYPES, value)
+        return ArchiveMapping(ZipFile(BytesIO(value), "r"), self.type_args[0].parse_binary_value)
+
+    def parse_binary_stream(self, stream: IO[bytes]) -> ArchiveMapping[InputType]:
+        # Entries are read from the stream as they are accessed, which requires it
+        # to be seekable; otherwise the (still compressed) archive is read into memory
+        if not stream.seekable():
+            stream = BytesIO(stream.read())
+
+        return ArchiveMapping(ZipFile(stream, "r"), self.type_args[0].parse_binary_value)
+
+    @property
+    def requires_seekable_stream(self) -> bool:
+        return True
+
+    def format_python_value(self, value: Mapping[str, OutputType]) -> bytes:
+        buffer = BytesIO()
+        self.format_python_value_to_stream(value, buffer)
+        return buffer.getvalue()
+
+    def format_python_value_to_stream(self, value: Mapping[str, OutputType], stream: IO[bytes]):
+        expect(Mapping, value)
+        expect(str, self._codec)
+
+        with ZipFile(stream, "w", compression=ZIP_CODECS[self._codec], compresslevel=self._level) as zf:
+            for name, entry in value.items():
+                expect(str, name)
+                with zf.open(name, "w", force_zip64=True) as member:
+                    self.type_args[0].format_python_value_to_stream(entry, member)
+
+    @instanceoptionalmethod
+    def format_type_args(self) -> str:
+        return format_codec_type_args(
+            self._type_args if instanceoptionalmethod.is_instance(self)
+            else self.type_params_expected_base_types()
+        )
+
+    @classmethod
+    def type_params_expected_base_types(cls) -> Tuple[UFDLType, ...]:
+        return UFDLType(), Integer(), Integer()
+
+    @property
+    def is_abstract(self) -> bool:
+        return self.type_args[0].is_abstract or self._codec is None
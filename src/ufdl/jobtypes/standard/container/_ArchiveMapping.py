@@ -0,0 +1,74 @@
+from typing import Callable, Dict, Iterator, Mapping
+from zipfile import ZipFile, ZipInfo
+
+from ...base import BinaryValue, InputType
+
+
+class ArchiveMapping(Mapping[str, InputType]):
+    """
+    Read-only mapping over the entries of an archive, which decompresses and
+    parses an entry only when it is accessed. Entries aren't kept once parsed,
+    so each access decompresses the entry again. The archive remains open
+    until the mapping is closed.
+    """
+    def __init__(self, zf: ZipFile, parse: Callable[[BinaryValue], InputType]):
+        self._zf: ZipFile = zf
+        self._parse: Callable[[BinaryValue], InputType] = parse
+
+        # Index of the archive's members, so lookups don't touch the entries themselves.
+        # Later members replace earlier ones of the same name, as for ZipFile.getinfo
+        self._infos: Dict[str, ZipInfo] = {info.filename: info for info in zf.infolist()}
+
+    def __getitem__(self, name: str) -> InputType:
+        info = self._infos.get(name, None)
+
+        if info is None:
+            raise KeyError(name)
+
+        return self._parse(self._zf.read(info))
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._infos
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._infos)
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    def compressed_size(self, name: str) -> int:
+        """
+        Gets the size of an entry as stored in the archive, without decompressing it.
+
+        :param name:
+                    The name of the entry.
+        :return:
+                    The compressed size in bytes.
+        """
+        return self._infos[name].compress_size
+
+    def size(self, name: str) -> int:
+        """
+        Gets the size of an entry's binary value, without decompressing it.
+
+        :param name:
+                    The name of the entry.
+        :return:
+                    The size in bytes.
+        """
+        return self._infos[name].file_size
+
+    def close(self):
+        """
+        Closes the underlying archive.
+        """
+        self._zf.close()
+
+    def __enter__(self) -> 'ArchiveMapping[InputType]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} entries)"
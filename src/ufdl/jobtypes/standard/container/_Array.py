@@ -1,10 +1,84 @@
-from typing import Optional, Tuple, overload
+import asyncio
+import sys
+from typing import IO, Any, Iterator, Optional, Sequence, Tuple, Union, overload
 
+from jsonschema import ValidationError
 from wai.json.raw import RawJSONElement
 from wai.json.schema import JSONSchema, regular_array
 
-from ...base import UFDLJSONType, InputType, OutputType, Integer, UFDLType
+from ...base import (
+    BinaryValue,
+    BINARY_VALUE_TYPES,
+    UFDLJSONType,
+    InputType,
+    OutputType,
+    Integer,
+    Float,
+    Boolean,
+    UFDLType
+)
 from ...error import expect
+from ...util import iter_json_array
+
+
+# The element types which can be represented as NumPy arrays, with the Python
+# types allowed for their raw JSON elements and the NumPy dtype kinds they accept
+NUMPY_ELEMENT_TYPES = {
+    Integer: ((int,), "iu"),
+    Float: ((int, float), "iuf"),
+    Boolean: ((bool,), "b")
+}
+
+
+def import_numpy():
+    """
+    Imports NumPy, which is an optional dependency.
+
+    :return:
+                The numpy module.
+    """
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("NumPy is required to represent arrays as NumPy arrays") from e
+
+    return numpy
+
+
+def size_error(required_size: int, size: Optional[int] = None, instance: Any = None) -> ValidationError:
+    """
+    Creates the error for an array with the wrong number of elements, as
+    raised when validating the array against its schema.
+
+    :param required_size:
+                The number of elements the array should have.
+    :param size:
+                The number of elements the array has, or None if it is
+                only known to have too many.
+    :param instance:
+                The array, if available.
+    :return:
+                The error.
+    """
+    too_long = size is None or size > required_size
+    return ValidationError(
+        f"Expected array of size {required_size}; got {'more' if size is None else size} elements",
+        validator="maxItems" if too_long else "minItems",
+        validator_value=required_size,
+        instance=instance
+    )
+
+
+def is_ndarray(value: Any) -> bool:
+    """
+    Whether the value is a NumPy array. Doesn't import NumPy if it isn't
+    already in use.
+
+    :param value:
+                The value to check.
+    """
+    numpy = sys.modules.get("numpy", None)
+    return numpy is not None and isinstance(value, numpy.ndarray)
 
 
 class Array(
@@ -39,23 +113,160 @@ class Array(
         super().__init__(args)
 
     def parse_json_value(self, value: RawJSONElement) -> Tuple[InputType, ...]:
-        self.validate_with_schema(value)
-        element_type = self.type_args[0]
+        # Only the shape of the array is checked here, as each element is
+        # validated by the element type as it is parsed
+        expect(list, value)
+        self.check_size(len(value), value)
+        return self.type_args[0].parse_json_values(value)
+
+    async def parse_json_value_async(self, value: RawJSONElement) -> Tuple[InputType, ...]:
+        expect(list, value)
+        self.check_size(len(value), value)
+        return await self.type_args[0].parse_json_values_async(value)
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[Tuple[InputType, ...], ...]:
         return tuple(
-            element_type.parse_json_value(element)
-            for element in value
+            await asyncio.gather(
+                *(
+                    self.parse_json_value_async(value)
+                    for value in values
+                )
+            )
         )
 
-    def format_python_value_to_json(self, value: Tuple[OutputType, ...]) -> RawJSONElement:
-        expect(tuple, value)
+    def parse_json_value_to_ndarray(self, value: RawJSONElement) -> 'numpy.ndarray':
+        """
+        Parses an array of numeric or boolean values into a NumPy array,
+        validating all elements at once rather than one at a time.
+
+        :param value:
+                    The value to parse, as JSON.
+        :return:
+                    The value as a one-dimensional NumPy array. Values which don't
+                    fit the element type's dtype (e.g. integers beyond 64 bits)
+                    are held exactly, in an array of dtype object.
+        """
+        numpy = import_numpy()
+        element_type = self.numpy_element_type()
+        python_types, _ = NUMPY_ELEMENT_TYPES[element_type]
+        expect(list, value)
+        self.check_size(len(value), value)
+
+        # Only elements of unexpected Python types need validating individually
+        invalid_types = set(map(type, value)).difference(python_types)
+        if len(invalid_types) > 0:
+            for element in value:
+                if type(element) in invalid_types:
+                    self.type_args[0].validate_with_schema(element)
+
+        try:
+            return numpy.array(value, dtype=element_type.value())
+        except OverflowError:
+            return numpy.array(value, dtype=object)
+
+    def parse_binary_value_to_ndarray(self, value: BinaryValue) -> 'numpy.ndarray':
+        """
+        Parses the binary (JSON) representation of an array of numeric or
+        boolean values into a NumPy array.
+
+        :param value:
+                    The value to parse, as binary.
+        :return:
+                    The value as a one-dimensional NumPy array.
+        """
+        from ...initialise import json_loads
+        expect(BINARY_VALUE_TYPES, value)
+        return self.parse_json_value_to_ndarray(json_loads(value))
+
+    def numpy_element_type(self) -> type:
+        """
+        Gets the element type of this array, which must be one that can be
+        represented by a NumPy array.
+
+        :return:
+                    The class of the element type.
+        """
+        element_type = type(self.type_args[0])
+        if element_type not in NUMPY_ELEMENT_TYPES:
+            raise TypeError(f"Can't represent {self} as a NumPy array")
+        return element_type
+
+    def check_size(self, size: int, instance: Any = None):
+        """
+        Checks the given number of elements is allowed by the array's size type.
+
+        :param size:
+                    The number of elements.
+        :param instance:
+                    The array, for the error if the size isn't allowed.
+        """
+        required_size = self.type_args[1].value()
+        if isinstance(required_size, int) and size != required_size:
+            raise size_error(required_size, size, instance)
+
+    def parse_binary_stream(self, stream: IO[bytes]) -> Tuple[InputType, ...]:
+        return tuple(self.iter_binary_stream(stream))
+
+    def iter_binary_stream(self, stream: IO[bytes]) -> Iterator[InputType]:
+        """
+        Parses the elements of an array from a stream of its binary (JSON)
+        representation, decoding, validating and parsing one element at a time.
+
+        :param stream:
+                    A readable binary file-like object containing the array.
+        :return:
+                    An iterator over the parsed elements.
+        """
         element_type, size_type = self.type_args
-        if isinstance(size_type.value(), int) and len(value) != size_type.value():
-            raise ValueError(f"Expected tuple of size {size_type}")
+        size = size_type.value()
+        count = 0
+        for element in iter_json_array(stream):
+            count += 1
+            if isinstance(size, int) and count > size:
+                raise size_error(size)
+            yield element_type.parse_json_value(element)
+
+        if isinstance(size, int) and count != size:
+            raise size_error(size, count)
+
+    def format_python_value_to_json(self, value: Union[Tuple[OutputType, ...], 'numpy.ndarray']) -> RawJSONElement:
+        if is_ndarray(value):
+            return self.format_ndarray_to_json(value)
+        expect(tuple, value)
+        self.check_size(len(value), value)
         return [
-            element_type.format_python_value_to_json(element)
+            self.type_args[0].format_python_value_to_json(element)
             for element in value
         ]
 
+    def format_ndarray_to_json(self, value: 'numpy.ndarray') -> RawJSONElement:
+        """
+        Formats a NumPy array into JSON, checking its dtype rather than
+        validating each element.
+
+        :param value:
+                    The one-dimensional NumPy array to format.
+        :return:
+                    The raw JSON representation of the array.
+        """
+        _, dtype_kinds = NUMPY_ELEMENT_TYPES[self.numpy_element_type()]
+        if value.ndim != 1:
+            raise ValidationError(
+                f"Expected one-dimensional array; got {value.ndim} dimensions",
+                validator="type",
+                validator_value="array",
+                instance=value
+            )
+
+        # Arrays of Python objects (e.g. as parsed from out-of-range integers) are formatted element-wise
+        if value.dtype.kind == "O":
+            return self.format_python_value_to_json(tuple(value.tolist()))
+
+        if value.dtype.kind not in dtype_kinds:
+            raise ValueError(f"Can't format array of dtype {value.dtype} as {self}")
+        self.check_size(len(value), value)
+        return value.tolist()
+
     @property
     def json_schema(self) -> JSONSchema:
         element_type, size_type = self.type_args
@@ -1,10 +1,12 @@
-from typing import Dict, Tuple
+import asyncio
+from typing import IO, Dict, Iterator, Sequence, Tuple
 
 from wai.json.raw import RawJSONElement
 from wai.json.schema import JSONSchema, standard_object
 
 from ...base import TypeArgsType, UFDLJSONType, InputType, OutputType, UFDLType
 from ...error import expect
+from ...util import iter_json_object
 
 
 class Map(
@@ -15,11 +17,47 @@ class Map(
     ]
 ):
     def parse_json_value(self, value: RawJSONElement) -> Dict[str, InputType]:
-        self.validate_with_schema(value)
-        return {
-            key: self.type_args[0].parse_json_value(sub_value)
-            for key, sub_value in value.items()
-        }
+        # Only the shape of the map is checked here, as each value is
+        # validated by the value type as it is parsed
+        expect(dict, value)
+        return dict(zip(
+            value.keys(),
+            self.type_args[0].parse_json_values(tuple(value.values()))
+        ))
+
+    async def parse_json_value_async(self, value: RawJSONElement) -> Dict[str, InputType]:
+        expect(dict, value)
+        return dict(zip(
+            value.keys(),
+            await self.type_args[0].parse_json_values_async(tuple(value.values()))
+        ))
+
+    async def parse_json_values_async(self, values: Sequence[RawJSONElement]) -> Tuple[Dict[str, InputType], ...]:
+        return tuple(
+            await asyncio.gather(
+                *(
+                    self.parse_json_value_async(value)
+                    for value in values
+                )
+            )
+        )
+
+    def parse_binary_stream(self, stream: IO[bytes]) -> Dict[str, InputType]:
+        return dict(self.iter_binary_stream(stream))
+
+    def iter_binary_stream(self, stream: IO[bytes]) -> Iterator[Tuple[str, InputType]]:
+        """
+        Parses the entries of a map from a stream of its binary (JSON)
+        representation, decoding, validating and parsing one entry at a time.
+
+        :param stream:
+                    A readable binary file-like object containing the map.
+        :return:
+                    An iterator over the keys and parsed values.
+        """
+        value_type = self.type_args[0]
+        for key, value in iter_json_object(stream):
+            yield key, value_type.parse_json_value(value)
 
     def format_python_value_to_json(self, value: Dict[str, OutputType]) -> RawJSONElement:
         expect(dict, value)
@@ -1,2 +1,4 @@
+from ._Archive import Archive
+from ._ArchiveMapping import ArchiveMapping
 from ._Array import Array
 from ._Map import Map
@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Type
+from typing import Hashable, List, Optional, Tuple, Type
 
 from ufdl.json.core.filter import FilterExpression
 from ufdl.json.core.filter.field import Exact
@@ -42,23 +42,33 @@ class Dataset(
     @property
     def instance_class(self):
         if self._instance_class is None:
-            domain_type = self.type_args[0].type_args[0].value()
+            self._instance_class = self.shared_instance_class(self.generate_instance_class)
 
-            class SpecialisedDatasetInstance(DatasetInstance):
-                domain = (
-                    ConstantProperty(value=domain_type)
-                    if isinstance(domain_type, str) else
-                    StringProperty(max_length=32)
-                )
+        return self._instance_class
 
-            self._instance_class = SpecialisedDatasetInstance
+    def generate_instance_class(self) -> Type[DatasetInstance]:
+        """
+        Creates the instance-class specialised to this type's arguments.
+        """
+        domain_type = self.type_args[0].type_args[0].value()
 
-        return self._instance_class
+        class SpecialisedDatasetInstance(DatasetInstance):
+            domain = (
+                ConstantProperty(value=domain_type)
+                if isinstance(domain_type, str) else
+                StringProperty(max_length=32)
+            )
+
+        return SpecialisedDatasetInstance
 
     def name_filter(self, name: str) -> FilterExpression:
         name, version = parse_v_name(name)
         return Exact(field="name", value=name) & Exact(field="version", value=int(version))
 
+    def normalise_name(self, name: str) -> Hashable:
+        name, version = parse_v_name(name)
+        return name, int(version)
+
     def extract_name_from_json(self, value: RawJSONObject) -> str:
         return f"{value['name']} v{value['version']}"
 
@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Type, overload
+from typing import Hashable, List, Optional, Tuple, Type, overload
 
 from ufdl.json.core.filter import FilterExpression
 from ufdl.json.core.filter.field import Exact
@@ -95,25 +95,34 @@ class DockerImage(
     @property
     def instance_class(self):
         if self._instance_class is None:
-            domain_type = self.type_args[0].type_args[0].value()
-            framework_type = self.type_args[1]
+            self._instance_class = self.shared_instance_class(self.generate_instance_class)
 
-            class SpecialisedDockerImageInstance(DockerImageInstance):
-                framework = framework_type.instance_class.as_property()
-                domain = (
-                    ConstantProperty(value=domain_type)
-                    if isinstance(domain_type, str) else
-                    StringProperty(max_length=32)
-                )
+        return self._instance_class
 
-            self._instance_class = SpecialisedDockerImageInstance
+    def generate_instance_class(self) -> Type[DockerImageInstance]:
+        """
+        Creates the instance-class specialised to this type's arguments.
+        """
+        domain_type = self.type_args[0].type_args[0].value()
+        framework_type = self.type_args[1]
 
-        return self._instance_class
+        class SpecialisedDockerImageInstance(DockerImageInstance):
+            framework = framework_type.instance_class.as_property()
+            domain = (
+                ConstantProperty(value=domain_type)
+                if isinstance(domain_type, str) else
+                StringProperty(max_length=32)
+            )
+
+        return SpecialisedDockerImageInstance
 
     def name_filter(self, name: str) -> FilterExpression:
         name, version = parse_v_name(name)
         return Exact(field="name", value=name) & Exact(field="version", value=version)
 
+    def normalise_name(self, name: str) -> Hashable:
+        return parse_v_name(name)
+
     def extract_name_from_json(self, value: RawJSONObject) -> str:
         return f"{value['name']} v{value['version']}"
 
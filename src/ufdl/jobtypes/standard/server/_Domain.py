@@ -41,18 +41,24 @@ class Domain(
     @property
     def instance_class(self):
         if self._instance_class is None:
-            name_type = self.type_args[0].value()
+            self._instance_class = self.shared_instance_class(self.generate_instance_class)
 
-            class SpecialisedDomainInstance(DomainInstance):
-                description = (
-                    ConstantProperty(value=name_type)
-                    if isinstance(name_type, str) else
-                    StringProperty(max_length=32)
-                )
+        return self._instance_class
+
+    def generate_instance_class(self) -> Type[DomainInstance]:
+        """
+        Creates the instance-class specialised to this type's arguments.
+        """
+        name_type = self.type_args[0].value()
 
-            self._instance_class = SpecialisedDomainInstance
+        class SpecialisedDomainInstance(DomainInstance):
+            description = (
+                ConstantProperty(value=name_type)
+                if isinstance(name_type, str) else
+                StringProperty(max_length=32)
+            )
 
-        return self._instance_class
+        return SpecialisedDomainInstance
 
     def extract_name_from_json(self, value: RawJSONObject) -> str:
         return value['description']
@@ -49,24 +49,31 @@ class Framework(
     @property
     def instance_class(self):
         if self._instance_class is None:
-            name_type = self.type_args[0].value()
-            version_type = self.type_args[1].value()
-
-            class SpecialisedFrameworkInstance(FrameworkInstance):
-                name = (
-                    ConstantProperty(value=name_type)
-                    if isinstance(name_type, str) else
-                    StringProperty(max_length=32)
-                )
-                version = (
-                    ConstantProperty(value=version_type)
-                    if isinstance(version_type, str) else
-                    StringProperty(max_length=32)
-                )
-
-            self._instance_class = SpecialisedFrameworkInstance
+            self._instance_class = self.shared_instance_class(self.generate_instance_class)
+
         return self._instance_class
 
+    def generate_instance_class(self) -> Type[FrameworkInstance]:
+        """
+        Creates the instance-class specialised to this type's arguments.
+        """
+        name_type = self.type_args[0].value()
+        version_type = self.type_args[1].value()
+
+        class SpecialisedFrameworkInstance(FrameworkInstance):
+            name = (
+                ConstantProperty(value=name_type)
+                if isinstance(name_type, str) else
+                StringProperty(max_length=32)
+            )
+            version = (
+                ConstantProperty(value=version_type)
+                if isinstance(version_type, str) else
+                StringProperty(max_length=32)
+            )
+
+        return SpecialisedFrameworkInstance
+
     def server_table_name(self) -> str:
         return "frameworks"
 
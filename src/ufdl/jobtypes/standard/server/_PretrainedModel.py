@@ -84,21 +84,27 @@ class PretrainedModel(
     @property
     def instance_class(self):
         if self._instance_class is None:
-            domain_type = self.type_args[0].type_args[0].value()
-            framework_type = self.type_args[1]
-
-            class SpecialisedPretrainedModelInstance(PretrainedModelInstance):
-                framework = framework_type.instance_class.as_property()
-                domain = (
-                    ConstantProperty(value=domain_type)
-                    if isinstance(domain_type, str) else
-                    StringProperty(max_length=32)
-                )
-
-            self._instance_class = SpecialisedPretrainedModelInstance
+            self._instance_class = self.shared_instance_class(self.generate_instance_class)
 
         return self._instance_class
 
+    def generate_instance_class(self) -> Type[PretrainedModelInstance]:
+        """
+        Creates the instance-class specialised to this type's arguments.
+        """
+        domain_type = self.type_args[0].type_args[0].value()
+        framework_type = self.type_args[1]
+
+        class SpecialisedPretrainedModelInstance(PretrainedModelInstance):
+            framework = framework_type.instance_class.as_property()
+            domain = (
+                ConstantProperty(value=domain_type)
+                if isinstance(domain_type, str) else
+                StringProperty(max_length=32)
+            )
+
+        return SpecialisedPretrainedModelInstance
+
     def name_filter(self, name: str) -> FilterExpression:
         return Exact(field="name", value=name)
 
@@ -1,56 +1,220 @@
-from io import BytesIO, BufferedIOBase
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
 from typing import IO, Optional, Tuple, Union, overload
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_STORED
 
-from ...base import InputType, OutputType, UFDLType, Integer
+from wai.common.meta import instanceoptionalmethod
+
+from ...base import BinaryValue, BINARY_VALUE_TYPES, InputType, OutputType, UFDLType, Integer
 from ...error import expect
+from ...util import iter_stream
+from ._block_compression import (
+    BLOCK_SIZE,
+    DATA_MEMBER,
+    FrameWriter,
+    iter_block_data,
+    iter_frame_data,
+    iter_stream_chunks,
+    ParallelBlockWriter,
+    write_block_member
+)
+from ._codec_type_args import codec_and_level, codec_type_args, format_codec_type_args
+from ._codecs import detect_codec, FRAME_CODECS, MAGIC_SIZE, writable_codec, ZIP_CODECS
 
 
 class Compressed(
     UFDLType[
-        Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer],
+        Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer, Integer],
         InputType,
         OutputType
     ]
 ):
     """
-    Handles compression/decompression of values.
+    Handles compression/decompression of values. The codec is given by compression
+    method number (the zip compression method for the zip format's codecs, 93 for
+    'zstd' and 65536 for 'lz4'). Codecs may also be given by name (one of 'stored',
+    'deflate', 'bzip2', 'lzma', 'zstd' or 'lz4'), which is replaced by the codec's
+    number (so Compressed<Model<...>, 'deflate'> is Compressed<Model<...>, 8>). The
+    compression level is optional, and is left out of the type-string when not
+    given, e.g. Compressed<Model<...>, 'zstd', 3> is Compressed<Model<...>, 93, 3>.
+    Values are read by their own format, so a value can be read whatever codec the
+    type gives.
     """
     @overload
-    def __init__(self, base_type: UFDLType[Tuple[UFDLType, ...], InputType, OutputType], compression_type: Optional[int] = None): ...
+    def __init__(
+            self,
+            base_type: UFDLType[Tuple[UFDLType, ...], InputType, OutputType],
+            codec: Optional[Union[str, int]] = None,
+            level: Optional[int] = None
+    ): ...
     @overload
-    def __init__(self, type_args: Optional[Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer]] = None): ...
+    def __init__(self, type_args: Optional[Tuple[UFDLType[Tuple[UFDLType, ...], InputType, OutputType], Integer, Integer]] = None): ...
 
     def __init__(self, *args):
-        if len(args) == 1:
-            if isinstance(args[0], UFDLType):
-                args = (args[0], Integer()),
-        elif len(args) > 0:
-            args = (args[0], Integer.generate_subclass(args[1])(), *args[2:]),
-
-        super().__init__(*args)
-
-    def parse_binary_value(self, value: bytes) -> InputType:
-        expect(bytes, value)
-        compression = self.type_args[1].value()
-        expect(int, compression)
-        value = BytesIO(value)
-        with ZipFile(value, "r", compression=compression) as zf:
-            return self.type_args[0].parse_binary_value(zf.read("data"))
+        super().__init__(codec_type_args(args))
+
+        self._codec, self._level = codec_and_level(self.type_args)
+
+    @property
+    def codec(self) -> Optional[str]:
+        """
+        The name of the codec values are compressed with, or None if not given.
+        """
+        return self._codec
+
+    @property
+    def level(self) -> Optional[int]:
+        """
+        The compression level, or None for the codec's default.
+        """
+        return self._level
+
+    def parse_binary_value(self, value: BinaryValue) -> InputType:
+        expect(BINARY_VALUE_TYPES, value)
+        return self.type_args[0].parse_binary_value(self.decompress(value))
+
+    async def parse_binary_value_async(self, value: BinaryValue) -> InputType:
+        expect(BINARY_VALUE_TYPES, value)
+        return await self.type_args[0].parse_binary_value_async(self.decompress(value))
+
+    def parse_binary_stream(self, stream: IO[bytes]) -> InputType:
+        head = stream.read(MAGIC_SIZE)
+        codec = detect_codec(head)
+
+        if codec is not None:
+            frames = iter_frame_data(iter_stream_chunks(stream, head), codec)
+            return self.type_args[0].parse_binary_stream(iter_stream(frames))
+
+        # Zip archives are read from the end, so must be seekable
+        if stream.seekable():
+            stream.seek(-len(head), io.SEEK_CUR)
+        else:
+            stream = BytesIO(head + stream.read())
+
+        zf = ZipFile(stream, "r")
+
+        # The decompressed member remains readable after the archive itself is closed
+        if DATA_MEMBER in zf.namelist():
+            with zf:
+                return self.type_args[0].parse_binary_stream(zf.open(DATA_MEMBER))
+
+        # Blocks are opened as they are read, so the archive is closed after the last block
+        return self.type_args[0].parse_binary_stream(iter_stream(iter_block_data(zf, close=True)))
+
+    @property
+    def requires_seekable_stream(self) -> bool:
+        # Zip archives are read from the end, whereas frames are read forwards
+        return self._codec not in FRAME_CODECS
+
+    def decompress(self, value: BinaryValue) -> bytes:
+        """
+        Decompresses a value, detecting its format from its first bytes.
+
+        :param value:
+                    The compressed value.
+        :return:
+                    The decompressed data.
+        """
+        codec = detect_codec(bytes(value[:MAGIC_SIZE]))
+
+        if codec is not None:
+            return b"".join(iter_frame_data((value,), codec))
+
+        with ZipFile(BytesIO(value), "r") as zf:
+            return self.read_data(zf)
+
+    def read_data(self, zf: ZipFile) -> bytes:
+        """
+        Reads the decompressed data of a value from its archive, whether it was
+        compressed in one piece or in parallel blocks.
+
+        :param zf:
+                    The archive.
+        :return:
+                    The decompressed data.
+        """
+        if DATA_MEMBER in zf.namelist():
+            return zf.read(DATA_MEMBER)
+        return b"".join(iter_block_data(zf))
+
+    def writable_codec(self) -> Tuple[str, Optional[int]]:
+        """
+        Gets the codec and level to compress values with, falling back
+        to another codec if the type's codec isn't installed.
+
+        :return:
+                    The name of the codec, and the level.
+        """
+        expect(str, self._codec)
+        return writable_codec(self._codec, self._level)
 
     def format_python_value(self, value: OutputType) -> bytes:
-        compression = self.type_args[1].value()
-        expect(int, compression)
         buffer = BytesIO()
-        with ZipFile(buffer, "w", compression=compression) as zf:
-            zf.writestr("data", self.type_args[0].format_python_value(value))
-        buffer.seek(0)
-        return buffer.read()
+        self.format_python_value_to_stream(value, buffer)
+        return buffer.getvalue()
+
+    def format_python_value_to_stream(self, value: OutputType, stream: IO[bytes]):
+        codec, level = self.writable_codec()
+
+        # The value is compressed as it is formatted, so it is never held in memory in full
+        if codec in ZIP_CODECS:
+            with ZipFile(stream, "w", compression=ZIP_CODECS[codec], compresslevel=level) as zf:
+                with zf.open(DATA_MEMBER, "w", force_zip64=True) as member:
+                    self.type_args[0].format_python_value_to_stream(value, member)
+        else:
+            with FrameWriter(stream, codec, level) as writer:
+                self.type_args[0].format_python_value_to_stream(value, writer)
+
+    def format_python_value_to_stream_parallel(
+            self,
+            value: OutputType,
+            stream: IO[bytes],
+            max_workers: Optional[int] = None,
+            block_size: int = BLOCK_SIZE
+    ):
+        """
+        Formats a Python value into binary, splitting the formatted value into blocks
+        which are compressed concurrently in a thread pool. For the codecs of the zip
+        format, the blocks are written as separate archive members; for the frame codecs,
+        as consecutive frames. Only a few blocks are held in memory at once.
+
+        :param value:
+                    The value to format.
+        :param stream:
+                    A writable binary file-like object to write the compressed value to.
+        :param max_workers:
+                    The number of threads to compress with, or None for one per CPU.
+        :param block_size:
+                    The number of uncompressed bytes in each block.
+        """
+        codec, level = self.writable_codec()
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            if codec in ZIP_CODECS:
+                with ZipFile(stream, "w", compression=ZIP_STORED) as zf:
+                    # The blocks are stored as-is, so their codec is recorded in the archive
+                    zf.comment = codec.encode("ascii")
+                    writer = ParallelBlockWriter(partial(write_block_member, zf), codec, level, executor, block_size, max_workers)
+                    self.type_args[0].format_python_value_to_stream(value, writer)
+                    writer.close()
+            else:
+                writer = ParallelBlockWriter(lambda index, block: stream.write(block), codec, level, executor, block_size, max_workers)
+                self.type_args[0].format_python_value_to_stream(value, writer)
+                writer.close()
+
+    @instanceoptionalmethod
+    def format_type_args(self) -> str:
+        return format_codec_type_args(
+            self._type_args if instanceoptionalmethod.is_instance(self)
+            else self.type_params_expected_base_types()
+        )
 
     @classmethod
     def type_params_expected_base_types(cls) -> Tuple[UFDLType, ...]:
-        return UFDLType(), Integer()
+        return UFDLType(), Integer(), Integer()
 
     @property
     def is_abstract(self) -> bool:
-        return self.type_args[0].is_abstract or type(self.type_args[1]) is Integer
+        return self.type_args[0].is_abstract or self._codec is None
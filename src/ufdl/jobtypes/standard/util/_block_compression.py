@@ -0,0 +1,334 @@
+import bz2
+import io
+import lzma
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import IO, Any, Callable, Deque, Iterable, Iterator, List, Optional
+from zipfile import ZipFile, ZIP_STORED
+
+from ._codecs import BZIP2, DEFLATE, import_codec, LZ4, LZMA, STORED, ZIP_CODECS, ZSTD
+
+# The name of the single member holding a value compressed in one piece
+DATA_MEMBER = "data"
+
+# The prefix of the numbered members ("data.0", "data.1", ...) holding
+# the independently-compressed blocks of a value compressed in parallel
+BLOCK_MEMBER_PREFIX = "data."
+
+# The default number of uncompressed bytes in each block
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# The number of bytes read from a member at a time when decompressing
+CHUNK_SIZE = 64 * 1024
+
+
+def compress_block(codec: str, data: bytes, level: Optional[int] = None) -> bytes:
+    """
+    Compresses a block of data with a codec. Blocks of the frame codecs
+    are complete frames, so can be concatenated.
+
+    :param codec:
+                The name of the codec.
+    :param data:
+                The block of data.
+    :param level:
+                The compression level, or None for the codec's default.
+    :return:
+                The compressed block.
+    """
+    if codec == STORED:
+        return data
+    elif codec == DEFLATE:
+        return zlib.compress(data, -1 if level is None else level)
+    elif codec == BZIP2:
+        return bz2.compress(data, 9 if level is None else level)
+    elif codec == LZMA:
+        return lzma.compress(data)
+    elif codec == ZSTD:
+        return import_codec(ZSTD).ZstdCompressor(level=3 if level is None else level).compress(data)
+    elif codec == LZ4:
+        return import_codec(LZ4).compress(data, compression_level=0 if level is None else level)
+
+    raise ValueError(f"Unsupported codec '{codec}'")
+
+
+def block_decompressor(codec: str) -> Optional[Any]:
+    """
+    Creates a decompressor for blocks compressed by compress_block.
+
+    :param codec:
+                The name of the codec.
+    :return:
+                The decompressor, or None if the blocks aren't compressed.
+    """
+    if codec == STORED:
+        return None
+    elif codec == DEFLATE:
+        return zlib.decompressobj()
+    elif codec == BZIP2:
+        return bz2.BZ2Decompressor()
+    elif codec == LZMA:
+        return lzma.LZMADecompressor()
+    elif codec == ZSTD:
+        return import_codec(ZSTD).ZstdDecompressor().decompressobj()
+    elif codec == LZ4:
+        return import_codec(LZ4).LZ4FrameDecompressor()
+
+    raise ValueError(f"Unsupported codec '{codec}'")
+
+
+def block_member_names(zf: ZipFile) -> List[str]:
+    """
+    Gets the names of the block members of an archive, in order.
+
+    :param zf:
+                The archive.
+    :return:
+                The names of the block members.
+    """
+    indices = sorted(
+        int(name[len(BLOCK_MEMBER_PREFIX):])
+        for name in zf.namelist()
+        if name.startswith(BLOCK_MEMBER_PREFIX) and name[len(BLOCK_MEMBER_PREFIX):].isdigit()
+    )
+
+    if len(indices) == 0:
+        raise KeyError(f"No '{DATA_MEMBER}' member or '{BLOCK_MEMBER_PREFIX}N' members in archive")
+
+    if indices != list(range(len(indices))):
+        raise ValueError(f"Missing blocks in archive; found {', '.join(map(str, indices))}")
+
+    return [f"{BLOCK_MEMBER_PREFIX}{index}" for index in indices]
+
+
+def block_codec(zf: ZipFile) -> str:
+    """
+    Gets the codec of the blocks of a value compressed in parallel, which
+    is recorded in the archive's comment.
+
+    :param zf:
+                The archive containing the blocks.
+    :return:
+                The name of the codec.
+    """
+    codec = zf.comment.decode("ascii", errors="replace")
+
+    if codec not in ZIP_CODECS:
+        raise ValueError(f"Archive doesn't record a codec for its blocks (comment is {zf.comment!r})")
+
+    return codec
+
+
+def write_block_member(zf: ZipFile, index: int, block: bytes):
+    """
+    Writes a compressed block to an archive as a numbered member.
+
+    :param zf:
+                The archive.
+    :param index:
+                The index of the block.
+    :param block:
+                The compressed block.
+    """
+    zf.writestr(f"{BLOCK_MEMBER_PREFIX}{index}", block, compress_type=ZIP_STORED)
+
+
+def iter_block_data(zf: ZipFile, close: bool = False) -> Iterator[bytes]:
+    """
+    Decompresses the blocks of a value compressed in parallel, a chunk at a time.
+
+    :param zf:
+                The archive containing the blocks.
+    :param close:
+                Whether to close the archive once the blocks have been read.
+    :return:
+                An iterator over chunks of the decompressed value.
+    """
+    try:
+        codec = block_codec(zf)
+        for name in block_member_names(zf):
+            decompressor = block_decompressor(codec)
+            with zf.open(name) as member:
+                while True:
+                    chunk = member.read(CHUNK_SIZE)
+                    if len(chunk) == 0:
+                        break
+                    yield chunk if decompressor is None else decompressor.decompress(chunk)
+
+            if hasattr(decompressor, "flush"):
+                yield decompressor.flush()
+    finally:
+        if close:
+            zf.close()
+
+
+def iter_stream_chunks(stream: IO[bytes], head: bytes = b"") -> Iterator[bytes]:
+    """
+    Reads a stream a chunk at a time.
+
+    :param stream:
+                A readable binary file-like object.
+    :param head:
+                Bytes already read from the start of the stream.
+    :return:
+                An iterator over the chunks of the stream.
+    """
+    if len(head) > 0:
+        yield head
+
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def iter_frame_data(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    """
+    Decompresses a sequence of frames of a frame codec, a chunk at a time.
+
+    :param chunks:
+                The chunks of the compressed frames.
+    :param codec:
+                The name of the frame codec.
+    :return:
+                An iterator over chunks of the decompressed value.
+    """
+    decompressor = block_decompressor(codec)
+    in_frame = False
+    for chunk in chunks:
+        # A chunk may finish one frame and start the next
+        while len(chunk) > 0:
+            in_frame = True
+            data = decompressor.decompress(chunk)
+            if len(data) > 0:
+                yield data
+
+            if not decompressor.eof:
+                break
+
+            chunk = decompressor.unused_data or b""
+            decompressor = block_decompressor(codec)
+            in_frame = False
+
+    if in_frame:
+        raise ValueError(f"Compressed value ends part-way through a '{codec}' frame")
+
+
+class FrameWriter(io.RawIOBase):
+    """
+    Writable stream which compresses the data written to it into a single
+    frame of a frame codec, as it is written.
+    """
+    def __init__(self, stream: IO[bytes], codec: str, level: Optional[int] = None):
+        super().__init__()
+
+        self._stream: IO[bytes] = stream
+
+        if codec == ZSTD:
+            self._compressor = import_codec(ZSTD).ZstdCompressor(level=3 if level is None else level).compressobj()
+        elif codec == LZ4:
+            self._compressor = import_codec(LZ4).LZ4FrameCompressor(compression_level=0 if level is None else level)
+            stream.write(self._compressor.begin())
+        else:
+            raise ValueError(f"'{codec}' is not a frame codec")
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._stream.write(self._compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        # The underlying stream is left open
+        if not self.closed:
+            self._stream.write(self._compressor.flush())
+
+        super().close()
+
+
+class ParallelBlockWriter(io.RawIOBase):
+    """
+    Writable stream which splits the data written to it into blocks, compresses the
+    blocks concurrently with an executor, and writes them in order. At most
+    max_pending blocks are held in memory at once.
+    """
+    def __init__(
+            self,
+            write_block: Callable[[int, bytes], Any],
+            codec: str,
+            level: Optional[int],
+            executor: Executor,
+            block_size: int = BLOCK_SIZE,
+            max_pending: Optional[int] = None
+    ):
+        super().__init__()
+
+        if block_size < 1:
+            raise ValueError(f"Block size must be positive; got {block_size}")
+
+        self._write_block: Callable[[int, bytes], Any] = write_block
+        self._codec: str = codec
+        self._level: Optional[int] = level
+        self._executor: Executor = executor
+        self._block_size: int = block_size
+        self._max_pending: int = max_pending if max_pending is not None else os.cpu_count() or 1
+
+        # The data written since the last full block
+        self._buffer: bytearray = bytearray()
+
+        # The blocks being compressed, in order
+        self._pending: Deque[Future] = deque()
+
+        # The number of blocks submitted for compression
+        self._block_count: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+
+        while len(self._buffer) >= self._block_size:
+            with memoryview(self._buffer) as view:
+                block = bytes(view[:self._block_size])
+            del self._buffer[:self._block_size]
+            self.submit(block)
+
+        return len(data)
+
+    def submit(self, block: bytes):
+        """
+        Submits a block for compression, first writing completed blocks
+        until there is room for another pending block.
+
+        :param block:
+                    The uncompressed block.
+        """
+        while len(self._pending) >= self._max_pending:
+            self.write_next_block()
+
+        self._pending.append(self._executor.submit(compress_block, self._codec, block, self._level))
+        self._block_count += 1
+
+    def write_next_block(self):
+        """
+        Waits for the next block in order to be compressed, and writes it.
+        """
+        index = self._block_count - len(self._pending)
+        self._write_block(index, self._pending.popleft().result())
+
+    def close(self):
+        if not self.closed:
+            # The final (partial) block; an empty value is written as a single empty block
+            if len(self._buffer) > 0 or self._block_count == 0:
+                self.submit(bytes(self._buffer))
+                self._buffer = bytearray()
+
+            while len(self._pending) > 0:
+                self.write_next_block()
+
+        super().close()
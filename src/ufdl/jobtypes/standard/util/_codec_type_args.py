@@ -0,0 +1,119 @@
+from typing import Optional, Sequence, Tuple
+
+from ...base import Integer, UFDLType, ValueType
+from ._codecs import codec_method, codec_name, CODECS, validate_level
+
+
+def codec_type_args(args: tuple) -> Optional[Tuple[UFDLType, ...]]:
+    """
+    Normalises the constructor arguments of a type whose type arguments are a
+    type, a codec and an optional compression level (e.g. Compressed). The
+    arguments are either the type arguments as a tuple (the level may be left
+    out), or the type, codec and level as Python values (the codec and level
+    may be left out). Codecs are identified by compression method number, so
+    codecs given by name are replaced by their number.
+
+    :param args:
+                The arguments to the type's constructor.
+    :return:
+                The type arguments.
+    """
+    if len(args) == 0 or len(args) == 1 and args[0] is None:
+        return None
+
+    if len(args) == 1 and isinstance(args[0], UFDLType):
+        return args[0], Integer(), Integer()
+
+    if len(args) == 1:
+        type_args = args[0]
+
+        # The level is optional in type-strings
+        if isinstance(type_args, tuple) and len(type_args) == 2:
+            type_args = (*type_args, Integer())
+    else:
+        type_args = (
+            args[0],
+            Integer() if args[1] is None else ValueType.generate_subclass(args[1])(),
+            Integer() if len(args) < 3 or args[2] is None else Integer.generate_subclass(args[2])()
+        )
+
+    # Anything else is left for the type to reject
+    if not isinstance(type_args, tuple) or len(type_args) != 3:
+        return type_args
+
+    return type_args[0], canonical_codec_type(type_args[1]), type_args[2]
+
+
+def canonical_codec_type(codec: UFDLType) -> UFDLType:
+    """
+    Gets the type argument identifying a codec, which may have been
+    given by name.
+
+    :param codec:
+                The codec type argument.
+    :return:
+                The canonical codec type argument.
+    """
+    if not isinstance(codec, ValueType):
+        return codec
+
+    value = codec.value()
+
+    # Any codec name is any codec
+    if value is str:
+        return Integer()
+
+    if value is None or isinstance(value, type):
+        return codec
+
+    return Integer.generate_subclass(codec_method(value))()
+
+
+def codec_and_level(
+        type_args: Tuple[UFDLType, ...],
+        codecs: Sequence[str] = CODECS
+) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Gets the codec and compression level given by the (normalised) type
+    arguments of a type, checking that they are allowed.
+
+    :param type_args:
+                The type's type arguments.
+    :param codecs:
+                The codecs the type allows.
+    :return:
+                The name of the codec, or None if not given, and the
+                compression level, or None for the codec's default.
+    """
+    codec = type_args[1].value()
+    level = type_args[2].value()
+
+    codec = None if isinstance(codec, type) else codec_name(codec)
+    level = None if isinstance(level, type) else level
+
+    if codec is not None and codec not in codecs:
+        raise ValueError(f"Codec '{codec}' can't be used here; expected one of {', '.join(codecs)}")
+
+    if level is not None:
+        if codec is None:
+            raise ValueError("A compression level can only be given with a codec")
+        validate_level(codec, level)
+
+    return codec, level
+
+
+def format_codec_type_args(type_args: Tuple[UFDLType, ...]) -> str:
+    """
+    Formats the type arguments of a type which takes a type, a codec
+    and an optional compression level.
+
+    :param type_args:
+                The type arguments.
+    :return:
+                The formatted type arguments.
+    """
+    # The level is left out when not given
+    if type(type_args[2]) is Integer:
+        type_args = type_args[:2]
+
+    return f"<{', '.join(str(arg) for arg in type_args)}>"
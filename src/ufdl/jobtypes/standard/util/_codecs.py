@@ -0,0 +1,198 @@
+import importlib
+import warnings
+from typing import Dict, Optional, Tuple, Union
+from zipfile import ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED
+
+from ...error import CodecUnavailableException
+
+# The names of the codecs
+STORED = "stored"
+DEFLATE = "deflate"
+BZIP2 = "bzip2"
+LZMA = "lzma"
+ZSTD = "zstd"
+LZ4 = "lz4"
+
+# The codecs which are written in a zip archive, with their zip compression methods
+ZIP_CODECS: Dict[str, int] = {
+    STORED: ZIP_STORED,
+    DEFLATE: ZIP_DEFLATED,
+    BZIP2: ZIP_BZIP2,
+    LZMA: ZIP_LZMA
+}
+
+# The compression method numbers which identify the codecs in type-strings. Those of the
+# zip format's codecs are their zip compression methods, and zstd has the method assigned
+# to it by the zip format's specification (APPNOTE). lz4 has no assigned method, so it is
+# given a number beyond the range of the zip format's (16-bit) method field
+CODEC_METHODS: Dict[str, int] = {
+    **ZIP_CODECS,
+    ZSTD: 93,
+    LZ4: 1 << 16
+}
+
+# The codec of each compression method number
+METHOD_CODECS: Dict[int, str] = {method: codec for codec, method in CODEC_METHODS.items()}
+
+# The codecs which are written as a sequence of frames in their own format, with the
+# (optional) modules which implement them and the packages which provide those modules
+FRAME_CODECS: Dict[str, Tuple[str, str]] = {
+    ZSTD: ("zstandard", "zstandard"),
+    LZ4: ("lz4.frame", "lz4")
+}
+
+# All supported codecs
+CODECS = (*ZIP_CODECS, *FRAME_CODECS)
+
+# The codec which is written instead of a frame codec whose package isn't installed
+FALLBACK_CODEC = DEFLATE
+
+# The allowed compression levels of each codec. Stored values have no level, and
+# the zip format's lzma compressor has fixed settings, so neither takes a level.
+# Negative zstd levels trade ratio for speed.
+LEVEL_RANGES: Dict[str, Tuple[int, int]] = {
+    DEFLATE: (0, 9),
+    BZIP2: (1, 9),
+    ZSTD: (-(1 << 17), 22),
+    LZ4: (0, 16)
+}
+
+# The magic numbers which begin a zip archive and each frame codec's frames
+ZIP_MAGIC = b"PK\x03\x04"
+FRAME_MAGICS: Dict[bytes, str] = {
+    b"\x28\xb5\x2f\xfd": ZSTD,
+    b"\x04\x22\x4d\x18": LZ4
+}
+MAGIC_SIZE = 4
+
+
+def codec_name(codec: Union[str, int]) -> str:
+    """
+    Gets the name of a codec given by name or compression method number.
+
+    :param codec:
+                The codec's name, or compression method number.
+    :return:
+                The codec's name.
+    """
+    if isinstance(codec, int) and not isinstance(codec, bool):
+        if codec not in METHOD_CODECS:
+            raise ValueError(
+                f"Unsupported compression method {codec}; "
+                f"expected one of {', '.join(map(str, METHOD_CODECS))}"
+            )
+        return METHOD_CODECS[codec]
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}; expected one of {', '.join(CODECS)}")
+
+    return codec
+
+
+def codec_method(codec: Union[str, int]) -> int:
+    """
+    Gets the compression method number of a codec given by name or number.
+
+    :param codec:
+                The codec's name, or compression method number.
+    :return:
+                The codec's compression method number.
+    """
+    return CODEC_METHODS[codec_name(codec)]
+
+
+def validate_level(codec: str, level: int):
+    """
+    Checks that a compression level is allowed for a codec.
+
+    :param codec:
+                The name of the codec.
+    :param level:
+                The compression level.
+    """
+    if codec not in LEVEL_RANGES:
+        raise ValueError(f"Codec '{codec}' doesn't take a compression level")
+
+    minimum, maximum = LEVEL_RANGES[codec]
+    if not minimum <= level <= maximum:
+        raise ValueError(f"Compression level for codec '{codec}' must be in [{minimum}, {maximum}]; got {level}")
+
+
+def import_codec(codec: str):
+    """
+    Imports the module which implements a frame codec, which is an optional dependency.
+
+    :param codec:
+                The name of the frame codec.
+    :return:
+                The module.
+    """
+    module, package = FRAME_CODECS[codec]
+
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise CodecUnavailableException(codec, package) from e
+
+
+def is_codec_available(codec: str) -> bool:
+    """
+    Whether the (optional) package implementing a codec is installed.
+
+    :param codec:
+                The name of the codec.
+    """
+    if codec in ZIP_CODECS:
+        return True
+
+    try:
+        import_codec(codec)
+        return True
+    except CodecUnavailableException:
+        return False
+
+
+def writable_codec(codec: str, level: Optional[int]) -> Tuple[str, Optional[int]]:
+    """
+    Gets the codec and level to write values with. Values are read by their own
+    format rather than the type's codec, so if the codec's package isn't
+    installed, the fallback codec is written instead (with a warning).
+
+    :param codec:
+                The name of the codec.
+    :param level:
+                The compression level, or None for the codec's default.
+    :return:
+                The codec and level to write with.
+    """
+    if is_codec_available(codec):
+        return codec, level
+
+    warnings.warn(
+        f"Codec '{codec}' requires the '{FRAME_CODECS[codec][1]}' package, which is not installed; "
+        f"compressing with '{FALLBACK_CODEC}' instead",
+        RuntimeWarning
+    )
+
+    return FALLBACK_CODEC, None
+
+
+def detect_codec(head: bytes) -> Optional[str]:
+    """
+    Detects the format of a compressed value from its first bytes.
+
+    :param head:
+                The first MAGIC_SIZE bytes of the value.
+    :return:
+                The frame codec the value is compressed with, or None
+                if the value is a zip archive.
+    """
+    if head == ZIP_MAGIC:
+        return None
+
+    codec = FRAME_MAGICS.get(head, None)
+
+    if codec is None:
+        raise ValueError(f"Unrecognised compressed format (starts with {head!r})")
+
+    return codec
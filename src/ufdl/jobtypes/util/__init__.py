@@ -1,3 +1,7 @@
-from ._parse import parse_type, parse_args
+from ._iter_json import iter_json_array, iter_json_object, JSONStreamReader
+from ._iter_stream import iter_stream, IterStream
+from ._parallel import parse_binary_values_in_parallel
+from ._parse import parse_type, parse_args, clear_parse_cache
 from ._parse_v_name import parse_v_name
-from ._read_all import read_all
+from ._read_all import read_all, read_all_async
+from ._spool import spool, spool_async
@@ -0,0 +1,178 @@
+import codecs
+import json
+from typing import IO, Iterator, Tuple
+
+from wai.json.raw import RawJSONElement
+
+# The number of bytes to read from the stream at a time
+CHUNK_SIZE = 64 * 1024
+
+# Characters which JSON allows between tokens
+WHITESPACE = " \t\n\r"
+
+# Characters which can continue a number
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+
+class JSONStreamReader:
+    """
+    Reads JSON tokens and values from a binary stream incrementally, holding
+    no more of the stream in memory than the value currently being decoded.
+    """
+    def __init__(self, stream: IO[bytes], chunk_size: int = CHUNK_SIZE):
+        self._stream: IO[bytes] = stream
+        self._chunk_size: int = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer: str = ""
+        self._position: int = 0
+        self._eof: bool = False
+
+    def _fill(self, size: int) -> bool:
+        """
+        Reads more of the stream into the buffer, discarding the already-consumed
+        portion of the buffer.
+
+        :param size:
+                    The number of bytes to read.
+        :return:
+                    Whether any more data could be read.
+        """
+        if self._eof:
+            return False
+
+        chunk = self._stream.read(size)
+        self._eof = len(chunk) == 0
+        self._buffer = self._buffer[self._position:] + self._decoder.decode(chunk, final=self._eof)
+        self._position = 0
+
+        return not self._eof
+
+    def peek(self) -> str:
+        """
+        Gets the next non-whitespace character without consuming it.
+
+        :return:
+                    The character, or the empty string at the end of the stream.
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in WHITESPACE:
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next non-whitespace character, which must be one of
+        the given characters.
+
+        :param characters:
+                    The allowed characters.
+        :return:
+                    The consumed character.
+        """
+        char = self.peek()
+
+        if char == "" or char not in characters:
+            raise ValueError(
+                f"Expected one of {', '.join(repr(c) for c in characters)} in JSON stream; "
+                f"got {repr(char) if char != '' else 'end of stream'}"
+            )
+
+        self._position += 1
+
+        return char
+
+    def read_value(self) -> RawJSONElement:
+        """
+        Decodes the next complete JSON value from the stream.
+
+        :return:
+                    The value.
+        """
+        self.peek()
+
+        # If the value runs to the end of the buffer (or is a number which may be
+        # continued) it may be incomplete, so read more (doubling the amount each
+        # time) until the value is known to be whole
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in NUMBER_CHARACTERS):
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+
+            self._fill(read_size)
+            read_size *= 2
+
+    def at_end(self) -> bool:
+        """
+        Whether only whitespace remains in the stream.
+        """
+        return self.peek() == ""
+
+
+def iter_json_array(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[RawJSONElement]:
+    """
+    Decodes the elements of a JSON array from a binary stream one at a time.
+
+    :param stream:
+                A readable binary file-like object containing a JSON array.
+    :param chunk_size:
+                The number of bytes to read from the stream at a time.
+    :return:
+                An iterator over the elements of the array.
+    """
+    reader = JSONStreamReader(stream, chunk_size)
+
+    reader.expect("[")
+
+    if reader.peek() == "]":
+        reader.expect("]")
+    else:
+        while True:
+            yield reader.read_value()
+            if reader.expect(",]") == "]":
+                break
+
+    if not reader.at_end():
+        raise ValueError("Extra content after JSON array in stream")
+
+
+def iter_json_object(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, RawJSONElement]]:
+    """
+    Decodes the properties of a JSON object from a binary stream one at a time.
+
+    :param stream:
+                A readable binary file-like object containing a JSON object.
+    :param chunk_size:
+                The number of bytes to read from the stream at a time.
+    :return:
+                An iterator over the key/value pairs of the object.
+    """
+    reader = JSONStreamReader(stream, chunk_size)
+
+    reader.expect("{")
+
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        while True:
+            if reader.peek() != '"':
+                raise ValueError("Expected property name in JSON stream")
+            key = reader.read_value()
+            reader.expect(":")
+            yield key, reader.read_value()
+            if reader.expect(",}") == "}":
+                break
+
+    if not reader.at_end():
+        raise ValueError("Extra content after JSON object in stream")
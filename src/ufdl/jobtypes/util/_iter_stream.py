@@ -0,0 +1,43 @@
+import io
+from typing import Iterable, Iterator, Optional
+
+
+class IterStream(io.RawIOBase):
+    """
+    Read-only binary stream over the chunks produced by an iterable, which
+    are only produced as the stream is read.
+    """
+    def __init__(self, chunks: Iterable[bytes]):
+        super().__init__()
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._remainder: Optional[memoryview] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._remainder is None or len(self._remainder) == 0:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._remainder = memoryview(chunk)
+
+        size = min(len(buffer), len(self._remainder))
+        buffer[:size] = self._remainder[:size]
+        self._remainder = self._remainder[size:]
+
+        return size
+
+
+def iter_stream(chunks: Iterable[bytes], buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> io.BufferedReader:
+    """
+    Creates a buffered binary stream over the chunks produced by an iterable.
+
+    :param chunks:
+                The chunks of data.
+    :param buffer_size:
+                The size of the stream's read buffer.
+    :return:
+                The stream.
+    """
+    return io.BufferedReader(IterStream(chunks), buffer_size)
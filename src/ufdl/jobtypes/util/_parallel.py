@@ -0,0 +1,44 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from ..base import BinaryValue, UFDLType
+
+
+def parse_binary_values_in_parallel(
+        type: UFDLType,
+        values: Iterable[BinaryValue],
+        max_workers: Optional[int] = None,
+        initializer: Optional[Callable[..., Any]] = None,
+        initargs: Tuple = (),
+        chunksize: int = 1,
+        executor: Optional[Executor] = None
+) -> List[Any]:
+    """
+    Parses a batch of binary values of a type across a pool of processes. The type
+    is sent to the workers by its type-string, so the workers must be able to parse
+    it: where processes are spawned rather than forked, the initializer should call
+    initialise_server with the same functions as this process.
+
+    :param type:
+                The type of the values.
+    :param values:
+                The binary values to parse.
+    :param max_workers:
+                The number of worker processes, or None for one per CPU.
+    :param initializer:
+                Called in each worker process when it starts.
+    :param initargs:
+                The arguments to the initializer.
+    :param chunksize:
+                The number of values sent to a worker at a time.
+    :param executor:
+                An existing executor to parse the values with, instead of
+                starting a new process pool.
+    :return:
+                The parsed values, in the same order as the binary values.
+    """
+    if executor is not None:
+        return list(executor.map(type.parse_binary_value, values, chunksize=chunksize))
+
+    with ProcessPoolExecutor(max_workers, initializer=initializer, initargs=initargs) as executor:
+        return list(executor.map(type.parse_binary_value, values, chunksize=chunksize))
@@ -1,9 +1,35 @@
+import re
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 from ..base import UFDLType, ValueType, TRUE_CONST_SYMBOL, FALSE_CONST_SYMBOL
 from ..error import TypeParsingException
 from ..initialise import name_translate
 
+# The maximum number of distinct type-strings whose parsed types are remembered
+PARSE_CACHE_SIZE = 1024
+
+# Token kinds
+STRING_TOKEN = "string"
+NUMBER_TOKEN = "number"
+NAME_TOKEN = "name"
+PUNCTUATION_TOKEN = "punctuation"
+
+# Matches a single token (with leading whitespace) of a type-string. Number tokens are
+# matched loosely, and converted by int()/float(), so every spelling they accept (e.g.
+# 1_000, 1e-3, inf, -Infinity, nan) is a number
+TOKEN_REGEX = re.compile(
+    r"\s*(?:"
+    rf"(?P<{STRING_TOKEN}>'(?:[^'\\]|\\.)*')"
+    rf"|(?P<{NUMBER_TOKEN}>[+-]?(?:(?:\d|\.\d)[\w.]*(?:(?<=[eE])[+-][\w.]+)?|(?i:infinity|inf|nan)(?!\w)))"
+    rf"|(?P<{NAME_TOKEN}>@?[^\W\d]\w*)"
+    rf"|(?P<{PUNCTUATION_TOKEN}>[<>,])"
+    r")"
+)
+
+# A token is its kind, its text, and its start/end positions in the type-string
+Token = Tuple[str, str, int, int]
+
 
 def parse_type(
         type_string: str
@@ -21,57 +47,42 @@ def parse_type(
     # Remove whitespace
     type_string = type_string.strip()
 
-    parsed_value_type = try_parse_value_type(type_string)
-    if parsed_value_type is not None:
-        return ValueType.generate_subclass(parsed_value_type)()
-
-    args_start = type_string.find("<")
-    if args_start == -1:
-        name = type_string.strip()
-        args = ""
-    else:
-        name = type_string[:args_start].strip()
-        args = type_string[args_start:].strip()
+    return parse_type_cached(type_string)
 
-    type_class = name_translate(name)
 
-    if type_class is None:
-        raise TypeParsingException(type_string, f"Unknown type-name \"{name}\"")
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_type_cached(type_string: str) -> UFDLType:
+    """
+    Parses a (whitespace-stripped) type-string, remembering the result
+    for the most recently parsed type-strings.
 
-    if args == "":
-        return type_class()
+    :param type_string:
+                The type's string representation.
+    :return:
+                The type.
+    """
+    tokens = tokenise(type_string)
 
-    try:
-        return type_class(parse_args(args))
-    except Exception as e:
-        raise TypeParsingException(type_string, e) from e
+    if len(tokens) == 0:
+        raise TypeParsingException(type_string, "Empty type-string")
 
+    type, index = parse_tokens(type_string, tokens, 0)
 
-def try_parse_value_type(type_string: str) -> Union[str, int, float, bool, None]:
-    # If the argument is single-quoted, it is a string-constant type argument
-    if type_string.startswith("'") and type_string.endswith("'"):
-        return type_string[1:-1].replace("\\'", "'")
+    if index != len(tokens):
+        raise TypeParsingException(
+            type_string,
+            f"Extra content after type: \"{type_string[tokens[index][2]:]}\""
+        )
 
-    # If int() can parse it, it's an int const type
-    # (must be before float as float() can parse ints)
-    try:
-        return int(type_string)
-    except ValueError:
-        pass
+    return type
 
-    # If float() can parse it, it's a float const type
-    try:
-        return float(type_string)
-    except ValueError:
-        pass
 
-    # Check if it's one of the boolean const types
-    if type_string == TRUE_CONST_SYMBOL:
-        return True
-    elif type_string == FALSE_CONST_SYMBOL:
-        return False
-
-    return None
+def clear_parse_cache():
+    """
+    Forgets all remembered type-string parses. Should be called whenever the
+    mapping from type-names to types changes.
+    """
+    parse_type_cached.cache_clear()
 
 
 def parse_args(args: str) -> Tuple[UFDLType]:
@@ -86,51 +97,179 @@ def parse_args(args: str) -> Tuple[UFDLType]:
     if args == "":
         return tuple()
 
-    return tuple(parse_type(arg) for arg in split_args(args))
+    tokens = tokenise(args)
+
+    if len(tokens) == 0 or tokens[0][1] != "<":
+        raise TypeParsingException(args, f"Arguments must be bracketed by <>")
 
+    type_args, index = parse_token_args(args, tokens, 0)
 
-def split_args(arg_string: str) -> List[str]:
+    if index != len(tokens):
+        raise TypeParsingException(
+            args,
+            f"Extra content after closing brace: \"{args[tokens[index][2]:]}\""
+        )
+
+    return type_args
+
+
+def tokenise(type_string: str) -> List[Token]:
     """
-    Splits a string-formatted list of type arguments into individual arguments..
+    Splits a type-string into its tokens in a single pass.
 
-    :param arg_string:
-                The formatted list of type arguments.
+    :param type_string:
+                The type-string to tokenise.
     :return:
-                A list of the individual arguments.
-    """
-    if not arg_string.startswith("<") or not arg_string.endswith(">"):
-        raise ValueError(f"Arguments must be bracketed by <>; got \"{arg_string}\"")
-
-    depth = 0
-    quoted = False
-    start = 1
-    result = []
-    for index, char in enumerate(arg_string):
-        if quoted:
-            if char == "'" and arg_string[index - 1] != "\\":
-                quoted = False
-        elif char == "'":
-            quoted = True
-        elif char == "<":
-            depth += 1
-        elif char == ">":
-            depth -= 1
-            if depth == 0:
+                The tokens of the type-string.
+    """
+    tokens = []
+    position = 0
+    length = len(type_string)
+    while position < length:
+        match = TOKEN_REGEX.match(type_string, position)
+
+        if match is None:
+            remaining = type_string[position:]
+
+            # Only trailing whitespace remains
+            if remaining.strip() == "":
                 break
-        elif char == "," and depth == 1:
-            result.append(arg_string[start:index].strip())
-            start = index + 1
 
-    if quoted:
-        raise ValueError(f"Unclosed quotes in \"{arg_string}\"")
-    if depth != 0:
-        raise ValueError(f"Unclosed brackets in arg_string \"{arg_string}\"")
-    if index != len(arg_string) - 1:
-        raise ValueError(f"Extra content after closing brace in \"{arg_string}\": \"{arg_string[index + 1:]}\"")
+            unexpected_position = position + len(remaining) - len(remaining.lstrip())
+            if type_string[unexpected_position] == "'":
+                raise TypeParsingException(type_string, f"Unclosed quotes at position {unexpected_position}")
+            raise TypeParsingException(
+                type_string,
+                f"Unexpected character '{type_string[unexpected_position]}' at position {unexpected_position}"
+            )
+
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind), match.end(kind)))
+        position = match.end()
+
+    return tokens
+
+
+def parse_tokens(
+        type_string: str,
+        tokens: List[Token],
+        index: int
+) -> Tuple[UFDLType, int]:
+    """
+    Parses a single type from the tokens of a type-string.
+
+    :param type_string:
+                The type-string the tokens were taken from.
+    :param tokens:
+                The tokens of the type-string.
+    :param index:
+                The index of the first token of the type.
+    :return:
+                The parsed type, and the index of the token after the type.
+    """
+    if index >= len(tokens):
+        raise TypeParsingException(type_string, "Unexpected end of type-string")
+
+    kind, text, start, end = tokens[index]
+
+    # String-constant type arguments are single-quoted
+    if kind == STRING_TOKEN:
+        return ValueType.generate_subclass(text[1:-1].replace("\\'", "'"))(), index + 1
+
+    # Numeric-constant type arguments are int or float
+    if kind == NUMBER_TOKEN:
+        return ValueType.generate_subclass(parse_number(type_string, text, start))(), index + 1
+
+    if kind != NAME_TOKEN:
+        raise TypeParsingException(type_string, f"Unexpected '{text}' at position {start}")
+
+    # Check if it's one of the boolean const types
+    if text == TRUE_CONST_SYMBOL:
+        return ValueType.generate_subclass(True)(), index + 1
+    elif text == FALSE_CONST_SYMBOL:
+        return ValueType.generate_subclass(False)(), index + 1
+
+    type_class = name_translate(text)
+
+    if type_class is None:
+        raise TypeParsingException(type_string, f"Unknown type-name \"{text}\"")
+
+    index += 1
+
+    if index == len(tokens) or tokens[index][1] != "<":
+        return type_class(), index
+
+    type_args, index = parse_token_args(type_string, tokens, index)
+
+    try:
+        return type_class(type_args), index
+    except Exception as e:
+        raise TypeParsingException(type_string[start:tokens[index - 1][3]], e) from e
+
+
+def parse_number(type_string: str, text: str, start: int) -> Union[int, float]:
+    """
+    Parses the text of a number token, as an int if int() can parse it
+    (which must be tried before float(), as float() can parse ints),
+    otherwise as a float.
+
+    :param type_string:
+                The type-string the token was taken from.
+    :param text:
+                The text of the token.
+    :param start:
+                The position of the token in the type-string.
+    :return:
+                The number.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        pass
+
+    try:
+        return float(text)
+    except ValueError:
+        raise TypeParsingException(type_string, f"Invalid number '{text}' at position {start}")
+
+
+def parse_token_args(
+        type_string: str,
+        tokens: List[Token],
+        index: int
+) -> Tuple[Tuple[UFDLType, ...], int]:
+    """
+    Parses a bracketed list of type arguments from the tokens of a type-string.
+
+    :param type_string:
+                The type-string the tokens were taken from.
+    :param tokens:
+                The tokens of the type-string.
+    :param index:
+                The index of the opening-bracket token.
+    :return:
+                The parsed type arguments, and the index of the token after
+                the closing bracket.
+    """
+    open_position = tokens[index][2]
+    index += 1
+
+    # Empty argument list
+    if index < len(tokens) and tokens[index][1] == ">":
+        return tuple(), index + 1
+
+    type_args = []
+    while True:
+        type_arg, index = parse_tokens(type_string, tokens, index)
+        type_args.append(type_arg)
 
-    last_arg = arg_string[start:index].strip()
+        if index == len(tokens):
+            raise TypeParsingException(type_string, f"Unclosed brackets at position {open_position}")
 
-    if last_arg != "":
-        result.append(last_arg)
+        kind, text, start, end = tokens[index]
+        index += 1
 
-    return result
+        if text == ">":
+            return tuple(type_args), index
+        elif text != ",":
+            raise TypeParsingException(type_string, f"Expected ',' or '>' at position {start}; got '{text}'")
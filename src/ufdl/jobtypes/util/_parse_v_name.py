@@ -1,9 +1,11 @@
 import re
+from functools import lru_cache
 from typing import Tuple
 
 V_NAME_REGEX = re.compile("^(.*) v(.*)$")
 
 
+@lru_cache(maxsize=1024)
 def parse_v_name(name: str) -> Tuple[str, str]:
     """
     Parses the name and version from a string of the form "{name} v{version}"
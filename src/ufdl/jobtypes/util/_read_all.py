@@ -1,18 +1,92 @@
-from io import BytesIO
-from typing import Iterable
+import asyncio
+from typing import AsyncIterable, Iterable, Optional, Union
 
 
-def read_all(iterable: Iterable[bytes]) -> bytes:
+def read_all(iterable: Iterable[bytes], size_hint: Optional[int] = None) -> bytearray:
     """
     Reads all bytes from the supplied iterable into a buffer.
 
     :param iterable:
                 An iterable of bytes.
+    :param size_hint:
+                The expected total number of bytes (e.g. from a Content-Length),
+                if known. When given, the buffer is allocated once up-front and
+                filled in place.
     :return:
                 The collected bytes of the iterable.
     """
-    buffer = BytesIO()
+    buffer = _Buffer(size_hint)
     for chunk in iterable:
         buffer.write(chunk)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.close()
+
+
+async def read_all_async(
+        iterable: Union[Iterable[bytes], AsyncIterable[bytes]],
+        size_hint: Optional[int] = None
+) -> bytearray:
+    """
+    Reads all bytes from the supplied (possibly asynchronous) iterable into a buffer.
+
+    :param iterable:
+                An iterable or asynchronous iterable of bytes.
+    :param size_hint:
+                The expected total number of bytes, if known.
+    :return:
+                The collected bytes of the iterable.
+    """
+    # Synchronous iterables may block, so are read in an executor
+    if not hasattr(iterable, "__aiter__"):
+        return await asyncio.get_running_loop().run_in_executor(None, read_all, iterable, size_hint)
+
+    # Chunks are written into the buffer as they arrive, rather than collected first
+    buffer = _Buffer(size_hint)
+    async for chunk in iterable:
+        buffer.write(chunk)
+    return buffer.close()
+
+
+class _Buffer:
+    """
+    Buffer which chunks of bytes are written into. When the total size is hinted,
+    the buffer is allocated once up-front and filled in place, falling back to
+    growing the buffer if more data than hinted is written.
+    """
+    def __init__(self, size_hint: Optional[int]):
+        self._size_hint: Optional[int] = size_hint
+        self._buffer: bytearray = bytearray() if size_hint is None else bytearray(size_hint)
+        self._view: Optional[memoryview] = None if size_hint is None else memoryview(self._buffer)
+        self._position: int = 0
+
+    def write(self, chunk: bytes):
+        view = self._view
+
+        if view is not None:
+            end = self._position + len(chunk)
+
+            if end <= self._size_hint:
+                view[self._position:end] = chunk
+                self._position = end
+                return
+
+            # More data than hinted, so the buffer is grown from here on (which
+            # requires there to be no view onto it)
+            view.release()
+            self._view = None
+            del self._buffer[self._position:]
+
+        self._buffer += chunk
+
+    def close(self) -> bytearray:
+        """
+        Finishes writing to the buffer.
+
+        :return:
+                    The written bytes.
+        """
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            del self._buffer[self._position:]
+
+        return self._buffer
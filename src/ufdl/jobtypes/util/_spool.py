@@ -0,0 +1,43 @@
+from tempfile import SpooledTemporaryFile
+from typing import IO, AsyncIterable, Iterable
+
+# The size beyond which spooled data is written to disk instead of being kept in memory
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def spool(iterable: Iterable[bytes], max_memory: int = SPOOL_MAX_MEMORY) -> IO[bytes]:
+    """
+    Writes all bytes from the supplied iterable into a temporary file, so that
+    they can be read back as a stream without collecting them in memory.
+
+    :param iterable:
+                An iterable of bytes.
+    :param max_memory:
+                The number of bytes to keep in memory before spooling to disk.
+    :return:
+                The temporary file, positioned at the start of the data.
+    """
+    file = SpooledTemporaryFile(max_size=max_memory)
+    for chunk in iterable:
+        file.write(chunk)
+    file.seek(0)
+    return file
+
+
+async def spool_async(iterable: AsyncIterable[bytes], max_memory: int = SPOOL_MAX_MEMORY) -> IO[bytes]:
+    """
+    Writes all bytes from the supplied asynchronous iterable into a temporary
+    file, as they arrive.
+
+    :param iterable:
+                An asynchronous iterable of bytes.
+    :param max_memory:
+                The number of bytes to keep in memory before spooling to disk.
+    :return:
+                The temporary file, positioned at the start of the data.
+    """
+    file = SpooledTemporaryFile(max_size=max_memory)
+    async for chunk in iterable:
+        file.write(chunk)
+    file.seek(0)
+    return file